@@ -1,29 +1,46 @@
 # Purpose: Compute realistic totals using provider-agnostic hotel quotes + per-day heuristics
-from typing import Dict, Any  # Typing
+from typing import Dict, Any, Optional  # Typing
 from ..tools.hotels import hotel_budget  # Hotel adapter (provider/fallback)
-from ..settings import Settings  # Defaults for daily costs
+from ..settings import Settings, get_settings  # Defaults for daily costs
 from ..utils.metrics import metrics  # Metrics timer
 
 
+async def quote_lodging(
+    city: str, start_date: str, days: int, settings: Optional[Settings] = None
+) -> Dict[str, Any]:
+    """
+    Hotel quote for the trip. Depends only on city and dates, so the orchestrator
+    starts it right away, concurrently with candidate generation and verification.
+    """
+    s = settings or get_settings()  # Shared settings
+    nights = max(1, days - 1)  # Nights = days - 1 (min 1 for short trips)
+    rooms = 1  # Assume 1 room (can parameterize later)
+
+    # Hotels quote (async provider call) protected by timer
+    with metrics.timer("budget_hotels"):
+        return await hotel_budget(city, start_date, nights, rooms, settings=s)
+
+
 async def estimate_budget(
-    itinerary: Dict[str, Any], currency: str = "USD"
+    itinerary: Dict[str, Any],
+    currency: str = "USD",
+    settings: Optional[Settings] = None,
+    hotel: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Compute totals:
       - lodging: provider-quoted (or heuristic) nightly * nights
       - food/transport/tickets/misc: per-day heuristics
     Also attach an 'explain' section with sources and assumptions.
+    `hotel` is a quote_lodging() result obtained earlier; fetched here when omitted.
     """
-    s = Settings()  # Load settings
+    s = settings or get_settings()  # Shared settings
     trip = itinerary["trip"]  # Trip block (city, days, budget, currency)
-    city = trip["city"]
     days = int(trip["days"])
-    nights = max(1, days - 1)  # Nights = days - 1 (min 1 for short trips)
-    rooms = 1  # Assume 1 room (can parameterize later)
-
-    # Hotels quote (async provider call) protected by timer
-    with metrics.timer("budget_hotels"):
-        hotel = await hotel_budget(city, itinerary["days"][0]["date"], nights, rooms)
+    if hotel is None:
+        hotel = await quote_lodging(
+            trip["city"], itinerary["days"][0]["date"], days, settings=s
+        )
 
     # Heuristic daily costs
     food = round(s.default_food_per_day * days, 2)
@@ -0,0 +1,155 @@
+# Purpose: Geographic planning — cluster verified POIs into days and order each day's route
+# - Days: capacity-constrained k-means over lat/lng (no day gets more than ceil(n/days)).
+# - Order: nearest-neighbour tour + 2-opt on an open path, using a haversine matrix.
+from math import ceil  # Bucket capacity
+from typing import Dict, Any, List  # Typing helpers
+
+import numpy as np  # Distance matrices + vectorized 2-opt
+
+from ..utils.geo import haversine_matrix  # Pairwise km distances
+
+# Capacity-constrained Lloyd iterations (converges fast on city data)
+_KMEANS_ROUNDS = 8
+
+
+def _has_coords(p: Dict[str, Any]) -> bool:
+    return isinstance(p.get("lat"), (int, float)) and isinstance(
+        p.get("lng"), (int, float)
+    )
+
+
+def _seed_centroids(dist: np.ndarray, k: int) -> List[int]:
+    """Farthest-first seeding (deterministic k-means++ variant) -> point indices."""
+    seeds = [int(np.argmax(dist.sum(axis=1)))]  # Start from the most peripheral point
+    nearest = dist[seeds[0]].copy()
+    for _ in range(1, k):
+        nxt = int(np.argmax(nearest))
+        seeds.append(nxt)
+        nearest = np.minimum(nearest, dist[nxt])
+    return seeds
+
+
+def _assign_with_capacity(d_pc: np.ndarray, capacity: int) -> np.ndarray:
+    """Greedy assignment: most clear-cut points first, each to its closest non-full centroid."""
+    k = d_pc.shape[1]
+    prefs = np.argsort(d_pc, axis=1).tolist()  # Centroids by distance, per point
+    labels = [-1] * len(prefs)
+    load = [0] * k
+    for i in np.argsort(d_pc.min(axis=1)).tolist():
+        for c in prefs[i]:
+            if load[c] < capacity:
+                labels[i] = c
+                load[c] += 1
+                break
+    return np.array(labels)
+
+
+def cluster_days(
+    lats: np.ndarray, lngs: np.ndarray, dist: np.ndarray, day_count: int
+) -> List[List[int]]:
+    """Split points into `day_count` geographic groups of at most ceil(n/day_count)."""
+    n = len(lats)
+    k = max(1, min(day_count, n))
+    capacity = ceil(n / k)
+    seeds = _seed_centroids(dist, k)
+    c_lat, c_lng = lats[seeds].astype(float), lngs[seeds].astype(float)
+
+    labels = np.zeros(n, dtype=int)
+    for _ in range(_KMEANS_ROUNDS):
+        # Equirectangular distance is plenty for ranking within a city
+        scale = np.cos(np.radians(c_lat.mean()))
+        d_pc = np.hypot(
+            lats[:, None] - c_lat[None, :], (lngs[:, None] - c_lng[None, :]) * scale
+        )
+        new_labels = _assign_with_capacity(d_pc, capacity)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        filled = counts > 0
+        c_lat[filled] = (np.bincount(labels, lats, k) / np.maximum(counts, 1))[filled]
+        c_lng[filled] = (np.bincount(labels, lngs, k) / np.maximum(counts, 1))[filled]
+
+    groups = [np.flatnonzero(labels == c).tolist() for c in range(k)]
+    return groups + [[] for _ in range(day_count - k)]
+
+
+def order_route(dist: np.ndarray) -> List[int]:
+    """Open-path tour over a distance matrix: nearest neighbour, then 2-opt."""
+    n = len(dist)
+    if n <= 2:
+        return list(range(n))
+
+    # Nearest neighbour from the most peripheral point (good start for an open path)
+    start = int(np.argmax(dist.sum(axis=1)))
+    route = [start]
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[route[-1]])
+        nxt = int(np.argmin(row))
+        route.append(nxt)
+        visited[nxt] = True
+
+    # 2-opt on an open path: reverse route[i..j] while that shortens it. A zero-cost
+    # dummy end node lets every j have a successor, and each pass scores all (i, j)
+    # moves at once with numpy.
+    d = np.zeros((n + 1, n + 1))
+    d[:n, :n] = dist
+    r = np.array(route + [n])
+    pos_i = np.arange(1, n)[:, None]
+    pos_j = np.arange(1, n)[None, :]
+    valid = pos_j > pos_i
+    for _ in range(n * n):  # Safety bound; converges in a handful of passes
+        a, b = r[:-2], r[1:-1]  # Edge (i-1, i) for i = 1..n-1
+        c, e = r[1:-1], r[2:]  # Edge (j, j+1) for j = 1..n-1
+        delta = (
+            d[a[:, None], c[None, :]]
+            + d[b[:, None], e[None, :]]
+            - d[a, b][:, None]
+            - d[c, e][None, :]
+        )
+        delta = np.where(valid, delta, 0.0)
+        flat = int(np.argmin(delta))
+        if delta.flat[flat] >= -1e-9:
+            break
+        i, j = divmod(flat, n - 1)
+        i, j = i + 1, j + 1
+        r[i : j + 1] = r[i : j + 1][::-1]
+    return r[:-1].tolist()
+
+
+def path_length_km(pois: List[Dict[str, Any]]) -> float:
+    """Total straight-line length of visiting `pois` in order (POIs without coords skipped)."""
+    pts = [p for p in pois if _has_coords(p)]
+    if len(pts) < 2:
+        return 0.0
+    dist = haversine_matrix(
+        np.array([p["lat"] for p in pts]), np.array([p["lng"] for p in pts])
+    )
+    return float(sum(dist[i, i + 1] for i in range(len(pts) - 1)))
+
+
+def plan_days(
+    verified: List[Dict[str, Any]], day_count: int
+) -> List[List[Dict[str, Any]]]:
+    """
+    Cluster POIs into days by location, then order each day to minimise travel.
+    POIs without coordinates are appended to the lightest days afterwards.
+    """
+    buckets: List[List[Dict[str, Any]]] = [[] for _ in range(day_count)]
+    located = [p for p in verified if _has_coords(p)]
+    if located:
+        lats = np.array([p["lat"] for p in located], dtype=float)
+        lngs = np.array([p["lng"] for p in located], dtype=float)
+        dist = haversine_matrix(lats, lngs)  # Computed once, sliced per day
+        for day_idx, group in enumerate(cluster_days(lats, lngs, dist, day_count)):
+            if not group:
+                continue
+            sub = dist[np.ix_(group, group)]
+            buckets[day_idx] = [located[group[i]] for i in order_route(sub)]
+
+    for p in verified:
+        if not _has_coords(p):
+            min(buckets, key=len).append(p)
+    return buckets
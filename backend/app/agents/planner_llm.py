@@ -1,42 +1,151 @@
 # Purpose: Ask the LLM for enough POIs to cover multiple days (3 per day target), then deduplicate
-from typing import Dict, Any, List  # Typing helpers
-from ..settings import Settings  # Settings (provider choices)
+# Candidates are cached per normalized request (city, preferences, day/budget buckets),
+# so popular destinations skip the LLM round trip entirely.
+import unicodedata  # City normalization
+from typing import AsyncIterator, Dict, Any, List, Optional  # Typing helpers
+from ..settings import Settings, get_settings  # Settings (provider choices)
 from ..llm.provider import LLMRouter  # Multi-provider router
+from ..utils.cache import TTLCache  # Bounded LRU + TTL cache
+from ..utils.metrics import metrics  # Duplicate counter
+from ..utils.text import FuzzyDeduper, city_tokens  # Alias-aware candidate dedup
 
+# Trip lengths that share cached candidates; the LLM is asked for the bucket's upper
+# bound so one cached list covers every trip length in the bucket
+_DAY_BUCKETS = (2, 4, 7, 10, 14)
+# Per-day budget tiers (trip currency): budget / mid / upscale / luxury
+_BUDGET_TIERS = (50.0, 150.0, 400.0)
 
-async def llm_poi_candidates(req: Dict[str, Any]) -> List[str]:
+# Separate instance so candidate lists get their own bounds (LLM_CACHE_*)
+_candidate_cache: Optional[TTLCache] = None  # Created from settings on first use
+
+
+def _cache(s: Settings) -> TTLCache:
+    global _candidate_cache
+    if _candidate_cache is None:
+        _candidate_cache = TTLCache(
+            name="llm_candidates",
+            ttl_seconds=s.llm_cache_ttl,
+            max_entries=s.llm_cache_max_entries,
+            max_bytes=s.llm_cache_max_bytes,
+        )
+    return _candidate_cache
+
+
+def _normalize_text(value: str) -> str:
+    """Unicode-normalize, casefold and collapse whitespace ("  Hà Nội " -> "hà nội")."""
+    return " ".join(unicodedata.normalize("NFKC", value).casefold().split())
+
+
+def day_bucket(days: int) -> int:
+    """Smallest bucket bound covering `days` (weeks beyond the last bucket)."""
+    for bound in _DAY_BUCKETS:
+        if days <= bound:
+            return bound
+    return -(-days // 7) * 7  # Round up to whole weeks
+
+
+def budget_tier(budget: float, days: int) -> int:
+    """Index of the per-day budget tier (0 = budget ... 3 = luxury)."""
+    per_day = budget / max(1, days)
+    return sum(1 for bound in _BUDGET_TIERS if per_day >= bound)
+
+
+def candidate_key(req: Dict[str, Any]) -> str:
+    """Cache key: normalized city/country, sorted lowercase preferences, buckets."""
+    days = int(req.get("days", 3))
+    prefs = sorted(
+        {
+            _normalize_text(str(p))
+            for p in (req.get("preferences") or [])
+            if str(p).strip()
+        }
+    )
+    return "llm_candidates:" + "|".join(
+        [
+            _normalize_text(str(req.get("city", ""))),
+            _normalize_text(str(req.get("country") or "")),
+            ",".join(prefs),
+            f"d{day_bucket(days)}",
+            f"b{budget_tier(float(req.get('budget', 1000)), days)}",
+        ]
+    )
+
+
+def candidate_target(days: int) -> int:
+    """Names asked of the LLM for a `days`-day trip (~3 per day + buffer, at least 8)."""
+    return max(8, days * 3 + 2)
+
+
+async def llm_poi_candidates(
+    req: Dict[str, Any], settings: Optional[Settings] = None
+) -> List[str]:
     """
     Request ~3 POIs per day (e.g., days * 3 + buffer).
     Return a clean list of unique names, normalized and deduplicated.
     """
-    s = Settings()  # Load settings
-    router = LLMRouter(s)  # Create LLM router
+    return [name async for name in llm_poi_candidate_stream(req, settings)]
+
+
+async def _aiter(items: List[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def llm_poi_candidate_stream(
+    req: Dict[str, Any], settings: Optional[Settings] = None
+) -> AsyncIterator[str]:
+    """
+    Same candidates as llm_poi_candidates, yielded one by one so consumers
+    (verification) can start on the first name while the rest are produced.
+    """
+    s = settings or get_settings()  # Shared settings
+
+    key = candidate_key(req) if s.llm_cache_enabled else ""
+    if key:
+        cached = _cache(s).get(key)
+        if cached is not None:  # Hit: no LLM round trip
+            for name in list(cached):
+                yield name
+            return
+
+    router = LLMRouter(s)  # Thin wrapper; provider clients come from the registry
 
     city = req.get("city", "")
     preferences = [p.lower() for p in (req.get("preferences") or [])]
     days = int(req.get("days", 3))
+    if key:  # Cached lists must cover the longest trip in the bucket
+        days = day_bucket(days)
     budget = float(req.get("budget", 1000))
 
     # Increase count implicitly by tweaking 'days' in the user payload (provider-agnostic)
     # Alternatively, you could modify the build_poi_prompt to accept a 'count' param.
-    want = max(8, days * 3 + 2)  # Minimum target size with a small buffer
+    want = candidate_target(days)  # Minimum target size with a small buffer
     # Trick: pass a higher 'days' to bias providers that scale with duration (simple, effective)
-    data = router.generate_pois(
-        city, preferences, max(days, (want // 3)), budget
-    )  # Sync call
+    prompt_days = max(days, (want // 3))
+    if s.llm_streaming:  # Each POI arrives as soon as the model has written it
+        items = router.stream_pois(city, preferences, prompt_days, budget)
+    else:
+        data = await router.generate_pois(
+            city, preferences, prompt_days, budget
+        )  # Async call: the event loop keeps serving other requests
+        items = _aiter(data.get("pois", []))
 
     names: List[str] = []
-    seen = set()
-    for item in data.get("pois", []):
+    # "Louvre" / "The Louvre" / "Musée du Louvre" would each cost a search + details
+    seen = FuzzyDeduper(s.candidate_fuzzy_threshold, ignore=city_tokens(city))
+    async for item in items:
         if not isinstance(item, dict):
             continue
         name = str(item.get("name", "")).strip()
         if not name:
             continue
-        key = name.lower()
-        if key in seen:
+        if not seen.add(name):
+            metrics.inc("llm_candidate_duplicates")
             continue
-        seen.add(key)
         names.append(name)
+        yield name
 
-    return names
+    # Never cache empty answers, or a stream that broke off midway
+    complete = router.stream_complete if s.llm_streaming else True
+    if key and names and complete:
+        _cache(s).set(key, list(names))
@@ -1,30 +1,251 @@
 # Purpose: Add transit estimates between consecutive items
-from typing import Dict, Any, List
+import asyncio  # Concurrent legs
+import time  # Leg latency (reported as saved time on cache hits)
+from math import isqrt  # Legs per matrix request
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
-from ..tools.maps import google_route
+from ..tools.maps import MATRIX_MAX_ELEMENTS, google_distance_matrix, google_route
+from ..settings import Settings, get_settings
+from ..utils.geo import haversine_km
+from ..utils.metrics import metrics
+from ..utils.cache import cache
+from ..utils.tracing import span
 
+# Fallback estimate when a Directions call fails: straight line * detour, urban transit speed
+_DETOUR_FACTOR = 1.3
+_TRANSIT_KMH = 20.0
+_TRANSIT_WAIT_MIN = 5
 
-async def route_day(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    if not items:
-        return items
+# Process-wide cap on in-flight Directions calls (created lazily inside the event loop)
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _route_slots(limit: int) -> asyncio.Semaphore:
+    """Return the shared semaphore bounding concurrent Directions calls."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, limit))
+    return _slots
+
+
+def _estimate_leg(prev: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, Any]:
+    """Rough transit estimate from straight-line distance, marked as estimated."""
+    try:
+        km = (
+            haversine_km(
+                prev["poi"]["lat"],
+                prev["poi"]["lng"],
+                cur["poi"]["lat"],
+                cur["poi"]["lng"],
+            )
+            * _DETOUR_FACTOR
+        )
+    except (KeyError, TypeError):  # Missing coordinates -> unknown distance
+        return {"mode": "transit", "duration_min": 0, "estimated": True}
+    return {
+        "mode": "transit",
+        "duration_min": int(km / _TRANSIT_KMH * 60) + _TRANSIT_WAIT_MIN,
+        "distance_km": round(km, 2),
+        "estimated": True,
+    }
+
+
+def _point(it: Dict[str, Any]) -> str:
+    """'lat,lng' string understood by both Directions and Distance Matrix."""
+    return f"{it['poi']['lat']},{it['poi']['lng']}"
+
+
+# Coordinate fallback key: 0.0005 deg grid (~55 m of latitude, less in longitude)
+_ROUTE_GRID_DEG = 0.0005
+
+
+def _grid_point(it: Dict[str, Any]) -> Optional[str]:
+    """Quantized 'lat,lng' so nearby points of one place share cached legs."""
+    lat, lng = it["poi"].get("lat"), it["poi"].get("lng")
+    if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+        return None  # No coordinates -> nothing stable to key on
+    lat = round(lat / _ROUTE_GRID_DEG) * _ROUTE_GRID_DEG
+    lng = round(lng / _ROUTE_GRID_DEG) * _ROUTE_GRID_DEG
+    return f"{lat:.4f},{lng:.4f}"
+
+
+def route_key(prev: Dict[str, Any], cur: Dict[str, Any], mode: str) -> Optional[str]:
+    """
+    Cache key for a leg: place ids when both ends have one, else quantized coords.
+    None (leg not cached) when an end has neither.
+    """
+    a, b = prev["poi"].get("place_id"), cur["poi"].get("place_id")
+    if a and b:
+        return f"route:{a}|{b}|{mode}"
+    ga, gb = _grid_point(prev), _grid_point(cur)
+    if ga is None or gb is None:
+        return None
+    return f"route:@{ga}|{gb}|{mode}"
+
+
+async def _route_leg(
+    prev: Dict[str, Any],
+    cur: Dict[str, Any],
+    slots: asyncio.Semaphore,
+    ttl: int,
+) -> Dict[str, Any]:
+    """
+    Directions for one leg, served from the route cache when possible.
+    A failed call degrades to an estimate instead of raising (estimates aren't cached).
+    """
+    key = route_key(prev, cur, "transit")
+    # Counts route_cache_hits / route_cache_misses
+    cached = cache.get(key) if key is not None else None
+    if cached is not None:
+        metrics.add_time("route_cache_saved", cached["latency_s"])
+        with span("route_leg", cache_hit=True):
+            return {"mode": "transit", **cached["route"]}
+
+    try:
+        with span("route_leg", cache_hit=False):
+            t0 = time.perf_counter()
+            async with slots:
+                route = await google_route(_point(prev), _point(cur), mode="transit")
+            latency = time.perf_counter() - t0
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        metrics.inc("route_errors")
+        return _estimate_leg(prev, cur)
+    if key is not None and (route.get("duration_min") or route.get("distance_km")):
+        # Empty answers (and legs without a key) are never cached
+        cache.set(key, {"route": route, "latency_s": latency}, ttl=ttl)
+    return {"mode": "transit", **route}
 
-    new_items: List[Dict[str, Any]] = []
 
-    for idx, it in enumerate(items):
-        if idx == 0:
-            new_items.append(it)
+Matrix = List[List[Optional[Dict[str, Any]]]]
+
+# Legs per Distance Matrix request: k legs bill k x k elements (API cap: 100)
+_LEGS_PER_MATRIX = isqrt(MATRIX_MAX_ELEMENTS)
+
+
+async def _matrix(
+    origins: List[str], destinations: List[str], slots: asyncio.Semaphore
+) -> Matrix:
+    """Distance Matrix for origins x destinations; a failed call yields all None."""
+    try:
+        async with slots:
+            return await google_distance_matrix(origins, destinations, mode="transit")
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        metrics.inc("route_errors")
+        return [[None] * len(destinations) for _ in origins]
+
+
+Leg = Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]  # prev, cur, cache key
+
+
+async def _route_run(legs: List[Leg], slots: asyncio.Semaphore, ttl: int) -> None:
+    """
+    One request for a day's consecutive legs: origins = the stops legs leave from,
+    destinations = the stops they reach; leg k is cell [k][k].
+    """
+    t0 = time.perf_counter()
+    m = await _matrix(
+        [_point(prev) for prev, _, _ in legs],
+        [_point(cur) for _, cur, _ in legs],
+        slots,
+    )
+    latency = time.perf_counter() - t0
+    for k, (prev, cur, key) in enumerate(legs):
+        cell = m[k][k]
+        if not cell:  # Unroutable / failed -> marked estimate (not cached)
+            cur["transport"] = _estimate_leg(prev, cur)
             continue
+        if key is not None and (cell.get("duration_min") or cell.get("distance_km")):
+            cache.set(key, {"route": cell, "latency_s": latency}, ttl=ttl)
+        cur["transport"] = {"mode": "transit", **cell}
+
 
-        prev = items[idx - 1]
-        origin = f"{prev['poi']['lat']},{prev['poi']['lng']}"
-        dest = f"{it['poi']['lat']},{it['poi']['lng']}"
+async def _route_days_matrix(
+    days: List[List[Dict[str, Any]]], s: Settings
+) -> List[List[Dict[str, Any]]]:
+    """
+    Distance Matrix backend: one request per day for the legs the route cache can't
+    serve (up to _LEGS_PER_MATRIX legs; longer days take several). Fewer requests
+    than Directions (one per day instead of one per leg), but the API bills every
+    origin x destination element: k legs cost k x k elements of which k are used
+    (4 for a 3-stop day, 25 for a 6-stop day). Answered legs are cached for both
+    backends.
+    """
+    slots = _route_slots(s.route_concurrency)
+    runs: List[List[Leg]] = []
+    for items in days:
+        todo: List[Leg] = []
+        for prev, cur in zip(items, items[1:]):
+            if _grid_point(prev) is None or _grid_point(cur) is None:
+                cur["transport"] = _estimate_leg(prev, cur)  # Nothing to route
+                continue
+            key = route_key(prev, cur, "transit")
+            # Counts route_cache_hits / route_cache_misses
+            cached = cache.get(key) if key is not None else None
+            if cached is not None:
+                metrics.add_time("route_cache_saved", cached["latency_s"])
+                cur["transport"] = {"mode": "transit", **cached["route"]}
+                continue
+            todo.append((prev, cur, key))
+        runs.extend(
+            todo[i : i + _LEGS_PER_MATRIX]
+            for i in range(0, len(todo), _LEGS_PER_MATRIX)
+        )
 
-        route = await google_route(origin, dest, mode="transit")
+    with span("route_matrix", requests=len(runs), legs=sum(map(len, runs))):
+        await asyncio.gather(*(_route_run(r, slots, s.route_cache_ttl) for r in runs))
+    return days
 
-        it["transport"] = {
-            "mode": "transit",
-            **route,
-        }
-        new_items.append(it)
 
-    return new_items
+async def route_day(
+    items: List[Dict[str, Any]], settings: Optional[Settings] = None
+) -> List[Dict[str, Any]]:
+    """Fill `transport` for every item after the first; all legs run concurrently."""
+    if not items:
+        return items
+
+    s = settings or get_settings()
+    if s.routing_backend == "matrix":
+        return (await _route_days_matrix([items], s))[0]
+    slots = _route_slots(s.route_concurrency)
+    legs = await asyncio.gather(
+        *(
+            _route_leg(items[idx - 1], items[idx], slots, s.route_cache_ttl)
+            for idx in range(1, len(items))
+        )
+    )
+    # gather() keeps leg order -> leg i belongs to item i + 1
+    for it, transport in zip(items[1:], legs):
+        it["transport"] = transport
+    return items
+
+
+async def route_days(
+    days: List[List[Dict[str, Any]]],
+    settings: Optional[Settings] = None,
+    on_day: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Route every day at once; latency follows the slowest leg, not the sum of legs.
+    `on_day(index, items)` is called as each day finishes routing.
+    """
+    s = settings or get_settings()
+    if s.routing_backend == "matrix":
+        routed = await _route_days_matrix(days, s)
+        if on_day is not None:  # Matrix requests span days -> all finish together
+            for idx, items in enumerate(routed):
+                on_day(idx, items)
+        return routed
+
+    async def route(idx: int, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        items = await route_day(items, s)
+        if on_day is not None:
+            on_day(idx, items)
+        return items
+
+    return list(
+        await asyncio.gather(*(route(idx, items) for idx, items in enumerate(days)))
+    )
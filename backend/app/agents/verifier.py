@@ -1,36 +1,279 @@
 # Purpose: Verify POIs via Google Maps and filter by rating/open-hours
-from typing import List, Dict, Any  # Typing
+# Once a city's centre is known (median of earlier verified POIs, per city + country),
+# searches are biased towards it and far-away namesakes are dropped before their
+# Details call, unless most of the request's searches land outside the radius (the
+# centre is then likely wrong). Verified POIs are de-duplicated by place_id and by
+# distance + name similarity before they are streamed.
+import asyncio  # Concurrent fan-out over candidates
+from typing import (  # Typing helpers
+    Any,
+    AsyncIterable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from ..tools.maps import google_place_search, google_place_detail  # Google adapters
-from ..settings import Settings  # Access MIN_RATING threshold
+from ..settings import Settings, get_settings  # MIN_RATING + concurrency cap
+from ..utils.cache import cache  # Learned city centres
+from ..utils.geo import haversine_km  # Distance to the city centre
+from ..utils.metrics import metrics  # Failure counters
+from ..utils.poi_index import index_key  # Normalized city|country
+from ..utils.spatial import PlaceDeduper, SpatialIndex  # Geo dedup + centre
 
+# Google caps the location-bias radius at 50 km
+_MAX_BIAS_RADIUS_M = 50_000
 
-async def verify_pois(poi_names: List[str], city: str) -> List[Dict[str, Any]]:
-    """
-    For each POI name candidate: search & fetch details, then filter by rating.
-    Returns a list of verified POI dicts (name/address/place_id/lat/lng/rating/url/opening_hours?).
-    """
-    s = Settings()  # Load settings (min rating)
-    verified: List[Dict[str, Any]] = []  # Accumulator for valid POIs
+# The centre is part of every biased search's cache key (memory + place store): it is
+# snapped to a ~5 km grid and only moved when a new median lands farther than this,
+# so per-request jitter of the median doesn't turn cached searches into misses
+_CENTRE_GRID_DEG = 0.05
+_CENTRE_MOVE_KM = 5.0
+
+# Process-wide cap on in-flight verifications (created lazily inside the event loop)
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _verify_slots(limit: int) -> asyncio.Semaphore:
+    """Return the shared semaphore bounding concurrent Places lookups."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, limit))
+    return _slots
+
+
+# Candidate sources still being read after their trip filled up (strong refs)
+_draining: Set["asyncio.Future[None]"] = set()
+
+
+def _detach(feeder: "asyncio.Future[None]") -> None:
+    """Let a candidate source finish in the background (so its answer gets cached)."""
+
+    def done(task: "asyncio.Future[None]") -> None:
+        _draining.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            metrics.inc("verify_source_errors")  # Retrieved: no "never retrieved" log
+
+    _draining.add(feeder)
+    feeder.add_done_callback(done)
+
+
+def _centre_key(city: str, country: Optional[str] = None) -> str:
+    return "city_centre:" + index_key(city, country)
+
+
+def _snap(point: Tuple[float, float]) -> Tuple[float, float]:
+    """Centre on the _CENTRE_GRID_DEG grid (stable search cache keys)."""
+    return (
+        round(round(point[0] / _CENTRE_GRID_DEG) * _CENTRE_GRID_DEG, 4),
+        round(round(point[1] / _CENTRE_GRID_DEG) * _CENTRE_GRID_DEG, 4),
+    )
+
+
+class _Area:
+    """A request's learned city centre, and how well its searches agree with it."""
+
+    def __init__(self, centre: Tuple[float, float], radius_km: float) -> None:
+        self.centre = centre
+        self.radius_km = radius_km
+        self.inside = 0  # Searches with a result within the radius
+        self.outside = 0  # Searches whose results all lie outside it
 
-    for name in poi_names:  # Iterate each candidate name
+    @property
+    def trusted(self) -> bool:
+        """Drop out-of-area results only while most searches land inside the radius."""
+        return self.outside <= self.inside
+
+
+def _in_radius(
+    place: Dict[str, Any], centre: Tuple[float, float], radius_km: float
+) -> bool:
+    lat, lng = place.get("lat"), place.get("lng")
+    if lat is None or lng is None:
+        return True  # Can't tell; let Details decide
+    return haversine_km(centre[0], centre[1], lat, lng) <= radius_km
+
+
+async def _verify_one(
+    name: str,
+    city: str,
+    min_rating: float,
+    slots: asyncio.Semaphore,
+    area: Optional[_Area] = None,
+) -> Optional[Dict[str, Any]]:
+    """Search + detail for one candidate; None when it is missing or filtered out."""
+    async with slots:  # Hold one slot for the whole search -> detail chain
         # Search for the place with city context to disambiguate
-        results = await google_place_search(f"{name} {city}")
+        if area is not None:
+            results = await google_place_search(
+                f"{name} {city}",
+                lat=area.centre[0],
+                lng=area.centre[1],
+                radius_m=int(min(area.radius_km * 1000, _MAX_BIAS_RADIUS_M)),
+            )
+            nearby = [r for r in results if _in_radius(r, area.centre, area.radius_km)]
+            trusted = area.trusted  # Judged on the searches before this one
+            if results:
+                if nearby:
+                    area.inside += 1
+                else:
+                    area.outside += 1
+            if nearby:
+                results = nearby  # Prefer the in-city match over a namesake
+            elif results and trusted:
+                # Namesakes outside the city never reach the Details call
+                metrics.inc("verify_out_of_area")  # A Details call saved
+                results = []
+            elif results:
+                metrics.inc("verify_out_of_area_kept")  # Centre doubtful: keep them
+        else:
+            results = await google_place_search(f"{name} {city}")
         if not results:  # If nothing found -> skip
-            continue
+            return None
 
         # Pick top result and fetch details for canonical metadata
         detail = await google_place_detail(results[0]["place_id"])
-        if not detail:  # If details failed -> skip
-            continue
+    if not detail:  # If details failed -> skip
+        return None
+
+    # Filter: rating must meet threshold (if a rating exists)
+    rating = detail.get("rating")
+    if isinstance(rating, (int, float)) and rating < min_rating:
+        # Below threshold -> skip
+        return None
+    return detail
+
+
+async def verify_pois(
+    poi_names: Union[Iterable[str], AsyncIterable[str]],
+    city: str,
+    settings: Optional[Settings] = None,
+    on_verified: Optional[Callable[[Dict[str, Any]], None]] = None,
+    enough: Optional[int] = None,
+    country: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    For each POI name candidate: search & fetch details, then filter by rating.
+    Candidates are verified concurrently (bounded by VERIFY_CONCURRENCY); the result
+    keeps candidate order and a failing candidate is dropped instead of failing all.
+    `poi_names` may be an async iterable: each candidate starts verifying as soon as
+    it arrives instead of after the whole candidate list is known.
+    `on_verified` is called with each POI as soon as it passes (completion order);
+    near-duplicates of an earlier POI are merged into it instead of passing.
+    With `enough`, a candidate only starts while the POIs confirmed plus the lookups
+    in flight are fewer than `enough`; otherwise it waits for one of them to finish,
+    and is skipped once `enough` distinct POIs have passed. At that point the rest of
+    an async source is no longer awaited: it is drained in the background (a streamed
+    LLM answer still completes and gets cached) while the verified POIs are returned.
+    Returns a list of verified POI dicts (name/address/place_id/lat/lng/rating/url/opening_hours?).
+    """
+    s = settings or get_settings()  # Shared settings (min rating, concurrency cap)
+    slots = _verify_slots(s.verify_concurrency)
+    centre = cache.get(_centre_key(city, country))  # Learned on earlier requests
+    area = _Area(centre, s.city_radius_km) if centre and s.city_radius_km > 0 else None
+    # Two candidates can resolve to one place (or to near-identical listings)
+    deduper = PlaceDeduper(s.dedup_radius_m, s.dedup_name_similarity)
+    confirmed = set()  # place_ids that passed so far
+    inflight = 0  # Lookups started and not yet finished (with `enough` only)
+    progress = asyncio.Condition()  # Notified whenever a lookup finishes
+    full = asyncio.Event()  # Set once `enough` distinct POIs have passed
+
+    async def admit() -> bool:
+        """Wait until this candidate may run; False when the trip is already full."""
+        nonlocal inflight
+        async with progress:
+            await progress.wait_for(
+                lambda: len(confirmed) >= enough or len(confirmed) + inflight < enough
+            )
+            if len(confirmed) >= enough:
+                return False
+            inflight += 1
+            return True
+
+    async def verify(name: str) -> Optional[Dict[str, Any]]:
+        nonlocal inflight
+        if enough is not None and not await admit():
+            metrics.inc("verify_skipped")  # A search + details call saved
+            return None
+        poi = None
+        try:
+            poi = await _verify_one(name, city, s.min_rating, slots, area)
+            if poi and not deduper.add(poi):
+                metrics.inc("verify_duplicates")
+                poi = None
+        finally:
+            if enough is not None:
+                async with progress:
+                    inflight -= 1
+                    if poi:
+                        confirmed.add(poi.get("place_id"))
+                        if len(confirmed) >= enough:
+                            full.set()
+                    progress.notify_all()
+        if poi and on_verified is not None:
+            on_verified(poi)
+        return poi
 
-        # Filter: rating must meet threshold (if a rating exists)
-        rating = detail.get("rating")
-        if isinstance(rating, (int, float)) and rating < s.min_rating:
-            # Below threshold -> skip
+    pending: List["asyncio.Future[Optional[Dict[str, Any]]]"] = []
+    if isinstance(poi_names, AsyncIterable):
+
+        async def feed() -> None:
+            async for name in poi_names:  # Start each lookup on arrival
+                pending.append(asyncio.ensure_future(verify(name)))
+
+        feeder = asyncio.ensure_future(feed())
+        stop = asyncio.ensure_future(full.wait())
+        try:
+            # Source exhausted, or the trip is full (later candidates would be skipped)
+            await asyncio.wait({feeder, stop}, return_when=asyncio.FIRST_COMPLETED)
+            if feeder.done():
+                feeder.result()  # Re-raise a failed candidate source
+            else:
+                _detach(feeder)
+        except BaseException:
+            feeder.cancel()
+            for fut in pending:  # Candidate source failed -> drop started lookups
+                fut.cancel()
+            raise
+        finally:
+            stop.cancel()
+    else:
+        pending = [asyncio.ensure_future(verify(name)) for name in poi_names]
+
+    results = await asyncio.gather(
+        *pending,
+        return_exceptions=True,  # Isolate per-candidate failures (HTTP errors, bad JSON)
+    )
+
+    verified: List[Dict[str, Any]] = []  # Accumulator for valid POIs
+    for res in results:  # gather() preserves candidate order
+        if isinstance(res, BaseException):
+            if isinstance(res, asyncio.CancelledError):
+                raise res  # Propagate cancellation of the whole request
+            metrics.inc("verify_errors")
             continue
+        if res:
+            verified.append(res)
 
-        # Keep verified record
-        verified.append(detail)
+    located = SpatialIndex(verified)
+    if len(located) >= 3 and s.city_radius_km > 0:  # Enough points for a stable median
+        mid = located.centre()
+        # Learn only from a tight list: namesakes from another city or a bad LLM answer
+        # would otherwise steer (and filter) every search for the city for a day
+        tight = 2 * len(located.within(mid[0], mid[1], s.city_radius_km)) > len(located)
+        moved = (
+            area is None  # First centre for this city
+            or not area.trusted  # The old one disagreed with this request's searches
+            or haversine_km(*area.centre, *mid) > _CENTRE_MOVE_KM
+        )
+        if tight:
+            # Unmoved: refresh the old centre's TTL, keeping cached searches valid
+            new = _snap(mid) if moved else area.centre
+            cache.set(_centre_key(city, country), new, ttl=s.place_search_ttl)
 
     # Return verified POIs (can be empty; orchestrator handles fallback)
     return verified
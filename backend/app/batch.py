@@ -0,0 +1,174 @@
+# Purpose: Batch itinerary generation (POST /api/agent/plan/batch and `python -m app.batch`)
+# - Runs many PlanRequests through build_itinerary in one process, under one global
+#   concurrency budget (BATCH_CONCURRENCY) shared by every batch in flight.
+# - Overlap across the batch is de-duplicated by the shared single-flight caches: LLM
+#   candidates (per city/preferences/bucket), Places search/details, route legs, hotel
+#   quotes and identical plans. Requests are scheduled grouped by city so overlapping
+#   lookups run close together (in flight or still cached).
+# - Results stream as NDJSON, one line per itinerary in completion order, then a summary
+#   with upstream calls per itinerary (process-wide counters: other traffic running at
+#   the same time is included, see upstream_calls_scope).
+#
+# CLI: python -m app.batch requests.ndjson [-o results.ndjson] [--concurrency 8]
+#      (input: one PlanRequest JSON per line, or a JSON array; "-" reads stdin)
+import argparse  # CLI flags
+import asyncio  # Concurrency budget
+import json  # NDJSON in/out
+import sys  # stdin/stdout/stderr
+import time  # Wall clock
+from typing import Any, AsyncIterator, Dict, List, Optional  # Typing helpers
+
+from .models import Itinerary, PlanRequest  # Validation in/out
+from .orchestrator import build_itinerary_shared  # Pipeline (+ identical-plan sharing)
+from .settings import get_settings, reload_settings  # BATCH_CONCURRENCY
+from .tools.http import start_http_client, close_http_client  # Shared pooled client
+from .llm.provider import registry  # LLM clients (closed at exit)
+from .utils.metrics import metrics  # Upstream call counts
+from .utils.place_store import close_place_store  # Persistent place store
+from .utils.poi_index import close_poi_index  # Hot-city POI index
+
+# Histogram labels that correspond to one upstream call each
+_UPSTREAM_PREFIXES = ("maps_", "hotels_http", "llm_")
+
+# Process-wide cap on itineraries in flight across batches (created lazily inside the
+# event loop)
+_slots: Optional[asyncio.Semaphore] = None
+_slots_limit = 0  # Size `_slots` was created with
+
+
+def _batch_slots(limit: int) -> asyncio.Semaphore:
+    """Return the shared semaphore bounding batch itineraries in flight."""
+    global _slots, _slots_limit
+    if _slots is None:
+        _slots, _slots_limit = asyncio.Semaphore(max(1, limit)), max(1, limit)
+    return _slots
+
+
+def _upstream_calls() -> Dict[str, int]:
+    """Upstream calls so far by label (Maps endpoint, hotels, each LLM provider)."""
+    return {
+        label: hist.count
+        for label, hist in metrics.histograms.items()
+        if label.startswith(_UPSTREAM_PREFIXES) and label != "llm_candidates"
+    }
+
+
+def _schedule(reqs: List[PlanRequest]) -> List[int]:
+    """Indexes ordered by city, then preferences: overlapping requests run together."""
+    return sorted(
+        range(len(reqs)),
+        key=lambda i: (
+            reqs[i].city.casefold(),
+            sorted(p.lower() for p in reqs[i].preferences),
+            reqs[i].days,
+        ),
+    )
+
+
+async def run_batch(
+    reqs: List[PlanRequest], concurrency: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield {"event": "item", "data": {index, status, itinerary|error}} per request as it
+    completes, then {"event": "summary", "data": {...}}. Closing the iterator early
+    cancels the remaining work.
+    Every batch shares one budget; `concurrency` (CLI) only sizes it on first use.
+    Upstream calls in the summary are the process-wide counters' delta over the run,
+    so requests served meanwhile (other batches, /api/agent/plan) are included.
+    """
+    slots = _batch_slots(concurrency or get_settings().batch_concurrency)
+    before = _upstream_calls()
+    t0 = time.perf_counter()
+
+    async def plan(index: int) -> Dict[str, Any]:
+        async with slots:
+            try:
+                result = await build_itinerary_shared(reqs[index].dict())
+                itinerary = Itinerary(**result).dict()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # One bad item must not sink the batch
+                return {"index": index, "status": "error", "error": str(e)}
+            return {"index": index, "status": "ok", "itinerary": itinerary}
+
+    # Tasks wait on the semaphore in schedule order (asyncio semaphores are FIFO)
+    tasks = [asyncio.ensure_future(plan(i)) for i in _schedule(reqs)]
+    ok = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            ok += item["status"] == "ok"
+            yield {"event": "item", "data": item}
+    finally:
+        for task in tasks:  # Consumer stopped early (client gone, Ctrl-C)
+            task.cancel()
+
+    after = _upstream_calls()
+    calls = {k: v - before.get(k, 0) for k, v in after.items() if v - before.get(k, 0)}
+    total = sum(calls.values())
+    yield {
+        "event": "summary",
+        "data": {
+            "items": len(reqs),
+            "ok": ok,
+            "failed": len(reqs) - ok,
+            "concurrency": _slots_limit,
+            "wall_s": round(time.perf_counter() - t0, 3),
+            "upstream_calls_scope": "process",  # Includes concurrent traffic
+            "upstream_calls": calls,
+            "upstream_calls_total": total,
+            "calls_per_itinerary": round(total / len(reqs), 2) if reqs else 0.0,
+        },
+    }
+
+
+def _read_requests(path: str) -> List[PlanRequest]:
+    """PlanRequests from NDJSON or a JSON array ("-" = stdin)."""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        rows = json.loads(stripped)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [PlanRequest(**row) for row in rows]
+
+
+async def _main(args: argparse.Namespace) -> int:
+    reqs = _read_requests(args.input)
+    settings = reload_settings()
+    await start_http_client(settings)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        async for event in run_batch(reqs, args.concurrency):
+            if event["event"] == "summary":
+                print(json.dumps(event["data"]), file=sys.stderr)
+                failed = event["data"]["failed"]
+            else:
+                item = event["data"]
+                if item["status"] != "ok":
+                    print(f"item {item['index']}: {item['error']}", file=sys.stderr)
+            out.write(json.dumps(event, default=str) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        await registry.aclose()
+        await close_http_client()
+        close_place_store()
+        close_poi_index()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Generate itineraries in bulk (NDJSON).")
+    ap.add_argument(
+        "input", help="PlanRequests as NDJSON or a JSON array ('-' = stdin)"
+    )
+    ap.add_argument("-o", "--output", help="write NDJSON here instead of stdout")
+    ap.add_argument("--concurrency", type=int, help="defaults to BATCH_CONCURRENCY")
+    sys.exit(asyncio.run(_main(ap.parse_args())))
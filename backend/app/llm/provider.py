@@ -1,18 +1,36 @@
 # Purpose: Provide a unified LLM router with multiple providers (Gemini, OpenAI, Anthropic)
 #          The router requests JSON output (schema) and returns parsed Python dict.
+#          All calls are async (SDK async clients) so a slow LLM never blocks the event loop.
 #          Each provider wrapper focuses on: (a) correct JSON mode, (b) simple prompt, (c) graceful fallback.
+#          With LLM_STREAMING, providers stream the completion and the router yields each POI
+#          object as soon as it closes (see stream_json), so verification starts early.
 
 from __future__ import annotations  # Enable future annotations (nice for type hints)
-from typing import Any, Dict, Optional, Tuple  # Import common typing helpers
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)  # Typing helpers
+import asyncio  # Hedged (raced) provider calls
 import json  # Parse JSON strings
+import time  # Per-provider latency samples
 from tenacity import (
     retry,
+    retry_if_exception,
     stop_after_attempt,
     wait_exponential,
 )  # Reliable retry for flaky network calls
 
 # Import our typed settings
 from ..settings import Settings  # Settings loader (keys, models, provider order)
+from ..utils.metrics import metrics  # Per-provider latency windows + counters
+from ..utils.tracing import span  # Request trace spans
+from ..utils.ratelimit import limited  # Per-provider QPS + adaptive concurrency
+from .stream_json import PoiStreamParser  # Incremental {"pois": [...]} parsing
 
 # --- Guard: lazily import SDKs to avoid import errors when keys are missing ---
 try:
@@ -31,6 +49,42 @@ except Exception:
     anthropic = None  # If import fails, we leave it None
 
 
+def is_rate_limited(exc: BaseException) -> bool:
+    """SDK-agnostic 429 check (openai/anthropic RateLimitError, Gemini ResourceExhausted)."""
+    if getattr(exc, "status_code", None) == 429 or getattr(exc, "code", None) == 429:
+        return True
+    return type(exc).__name__ in (
+        "RateLimitError",
+        "ResourceExhausted",
+        "TooManyRequests",
+    )
+
+
+def _count_retry(retry_state: Any) -> None:
+    """tenacity before_sleep hook: count provider retries (per provider class)."""
+    owner = getattr(retry_state.fn, "__qualname__", "llm").split(".")[0]
+    metrics.inc("llm_retries")
+    metrics.inc(f"llm_retries_{owner.replace('Provider', '').lower()}")
+
+
+def _retryable(exc: BaseException) -> bool:
+    """
+    Errors worth one more attempt. tenacity catches BaseException, so CancelledError
+    (hedge loser, client gone) must be excluded explicitly or the call would resume.
+    429s are retried by the rate limiter (backoff + lower concurrency), not here.
+    """
+    return isinstance(exc, Exception) and not is_rate_limited(exc)
+
+
+# Shared by every provider call: one retry with backoff for transient failures
+_provider_retry = retry(
+    stop=stop_after_attempt(2),
+    wait=wait_exponential(multiplier=0.5, max=4),
+    before_sleep=_count_retry,
+    retry=retry_if_exception(_retryable),
+)
+
+
 # Helper: strict JSON parsing with helpful error
 def _force_json(text: str) -> Dict[str, Any]:
     """Try to parse JSON; raise a clear ValueError if invalid JSON is returned by the LLM."""
@@ -92,25 +146,40 @@ class GeminiProvider:
     def __init__(self, api_key: str, model: str):  # Store credentials and default model
         self.api_key = api_key  # Save API key locally
         self.model = model  # Save model name
+        self._client: Any = None  # GenerativeModel, built on first call and reused
         if genai:  # If SDK is available
             genai.configure(api_key=api_key)  # Configure SDK globally with API key
 
-    @retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.5, max=4))
-    def generate_pois(
+    @_provider_retry
+    async def generate_pois(
         self, city: str, preferences: list[str], days: int, budget: float
     ) -> Dict[str, Any]:
         """Call Gemini with strict JSON response."""
+        response = await self._generate(city, preferences, days, budget, stream=False)
+        # Extract text (Gemini SDK returns a response object with .text)
+        text = response.text or ""  # Get returned text (should be JSON)
+        return _force_json(text)  # Parse into Python dict or raise if invalid
+
+    async def _generate(
+        self,
+        city: str,
+        preferences: list[str],
+        days: int,
+        budget: float,
+        stream: bool,
+    ) -> Any:
+        """One generate_content_async call (streamed or not) for the POI prompt."""
         if not genai:  # If SDK is missing, raise an informative error
             raise RuntimeError("google-generativeai SDK is not installed")
-
         system, user = build_poi_prompt(
             city, preferences, days, budget
         )  # Build the prompt messages
-        model = genai.GenerativeModel(  # Create a GenerativeModel instance
-            model_name=self.model,  # Use the configured model
-            system_instruction=system,  # Provide system instruction (role + output constraints)
-        )
-        response = model.generate_content(  # Call the model to generate content
+        if self._client is None:  # System instruction is constant -> build once
+            self._client = genai.GenerativeModel(  # Create a GenerativeModel instance
+                model_name=self.model,  # Use the configured model
+                system_instruction=system,  # Provide system instruction (role + output constraints)
+            )
+        return await self._client.generate_content_async(  # Async generate call
             [  # Provide a list of parts to the model
                 {
                     "role": "user",
@@ -124,36 +193,63 @@ class GeminiProvider:
             generation_config={  # Generation config to enforce JSON
                 "response_mime_type": "application/json"  # Ask for JSON-only response
             },
+            stream=stream,
         )
-        # Extract text (Gemini SDK returns a response object with .text)
-        text = response.text or ""  # Get returned text (should be JSON)
-        return _force_json(text)  # Parse into Python dict or raise if invalid
+
+    @_provider_retry
+    async def open_stream(
+        self, city: str, preferences: list[str], days: int, budget: float
+    ) -> AsyncIterator[str]:
+        """Start a streamed completion; returns an iterator over its text deltas."""
+        response = await self._generate(city, preferences, days, budget, stream=True)
+
+        async def deltas() -> AsyncIterator[str]:
+            async for chunk in response:  # One chunk per streamed candidate part
+                text = getattr(chunk, "text", "")
+                if text:
+                    yield text
+
+        return deltas()
 
 
 # Provider wrapper: OpenAI
 class OpenAIProvider:
     """Wrapper around OpenAI to request JSON output."""
 
-    def __init__(self, api_key: str, model: str):  # Store credentials and default model
+    def __init__(
+        self, api_key: str, model: str, base_url: Optional[str] = None
+    ):  # Store credentials and default model
         if not openai:  # Ensure SDK is installed
             raise RuntimeError("openai SDK is not installed")
-        self.client = openai.OpenAI(
-            api_key=api_key
-        )  # Instantiate OpenAI client with API key
+        self.client = openai.AsyncOpenAI(
+            api_key=api_key, base_url=base_url or None
+        )  # Instantiate async OpenAI client (default endpoint unless OPENAI_BASE_URL)
         self.model = model  # Save model name
 
-    @retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.5, max=4))
-    def generate_pois(
+    @_provider_retry
+    async def generate_pois(
         self, city: str, preferences: list[str], days: int, budget: float
     ) -> Dict[str, Any]:
         """Call OpenAI Chat Completions (JSON mode) to get POI list."""
+        resp = await self.client.chat.completions.create(  # Chat completion request
+            **self._request(city, preferences, days, budget)
+        )
+        text = (
+            resp.choices[0].message.content or ""
+        )  # Extract the assistant content (should be JSON)
+        return _force_json(text)  # Parse into Python dict or raise if invalid
+
+    def _request(
+        self, city: str, preferences: list[str], days: int, budget: float
+    ) -> Dict[str, Any]:
+        """Chat Completions arguments for the POI prompt (JSON mode)."""
         system, user = build_poi_prompt(
             city, preferences, days, budget
         )  # Build messages
-        resp = self.client.chat.completions.create(  # Create a chat completion request
-            model=self.model,  # Target model
-            response_format={"type": "json_object"},  # Ask OpenAI to return valid JSON
-            messages=[  # Chat messages array (system + user)
+        return {
+            "model": self.model,  # Target model
+            "response_format": {"type": "json_object"},  # Ask for valid JSON
+            "messages": [  # Chat messages array (system + user)
                 {
                     "role": "system",
                     "content": system,
@@ -163,12 +259,27 @@ class OpenAIProvider:
                     "content": json.dumps(user),
                 },  # User content as JSON string
             ],
-            temperature=0.2,  # Lower temperature for determinism
-        )
-        text = (
-            resp.choices[0].message.content or ""
-        )  # Extract the assistant content (should be JSON)
-        return _force_json(text)  # Parse into Python dict or raise if invalid
+            "temperature": 0.2,  # Lower temperature for determinism
+        }
+
+    @_provider_retry
+    async def open_stream(
+        self, city: str, preferences: list[str], days: int, budget: float
+    ) -> AsyncIterator[str]:
+        """Start a streamed completion; returns an iterator over its text deltas."""
+        stream = await self.client.chat.completions.create(
+            **self._request(city, preferences, days, budget), stream=True
+        )  # Returns once response headers arrive (errors / 429s raise here)
+
+        async def deltas() -> AsyncIterator[str]:
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()  # Consumer stopped early -> drop the connection
+
+        return deltas()
 
 
 # Provider wrapper: Anthropic
@@ -178,30 +289,18 @@ class AnthropicProvider:
     def __init__(self, api_key: str, model: str):  # Store credentials and default model
         if not anthropic:  # Ensure SDK is installed
             raise RuntimeError("anthropic SDK is not installed")
-        self.client = anthropic.Anthropic(
+        self.client = anthropic.AsyncAnthropic(
             api_key=api_key
-        )  # Instantiate Anthropic client with API key
+        )  # Instantiate async Anthropic client with API key
         self.model = model  # Save model name
 
-    @retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=0.5, max=4))
-    def generate_pois(
+    @_provider_retry
+    async def generate_pois(
         self, city: str, preferences: list[str], days: int, budget: float
     ) -> Dict[str, Any]:
         """Call Claude Messages API and request JSON content."""
-        system, user = build_poi_prompt(
-            city, preferences, days, budget
-        )  # Build messages
-        resp = self.client.messages.create(  # Create a Claude message request
-            model=self.model,  # Target model
-            system=system,  # System instruction (role + JSON schema)
-            messages=[  # Conversation stack
-                {
-                    "role": "user",
-                    "content": json.dumps(user),
-                }  # Provide user content as JSON string
-            ],
-            temperature=0.2,  # Lower temperature for stability
-            max_tokens=1024,  # Reasonable cap for response length
+        resp = await self.client.messages.create(  # Create a Claude message request
+            **self._request(city, preferences, days, budget)
         )
         # Claude returns structured content; we extract text from the first content block
         text = ""  # Initialize empty text
@@ -215,6 +314,147 @@ class AnthropicProvider:
                 text = block["text"]  # Use dict['text']
         return _force_json(text)  # Parse into Python dict or raise if invalid
 
+    def _request(
+        self, city: str, preferences: list[str], days: int, budget: float
+    ) -> Dict[str, Any]:
+        """Messages API arguments for the POI prompt."""
+        system, user = build_poi_prompt(
+            city, preferences, days, budget
+        )  # Build messages
+        return {
+            "model": self.model,  # Target model
+            "system": system,  # System instruction (role + JSON schema)
+            "messages": [  # Conversation stack
+                {
+                    "role": "user",
+                    "content": json.dumps(user),
+                }  # Provide user content as JSON string
+            ],
+            "temperature": 0.2,  # Lower temperature for stability
+            "max_tokens": 1024,  # Reasonable cap for response length
+        }
+
+    @_provider_retry
+    async def open_stream(
+        self, city: str, preferences: list[str], days: int, budget: float
+    ) -> AsyncIterator[str]:
+        """Start a streamed message; returns an iterator over its text deltas."""
+        stream = await self.client.messages.create(
+            **self._request(city, preferences, days, budget), stream=True
+        )  # Returns once response headers arrive (errors / 429s raise here)
+
+        async def deltas() -> AsyncIterator[str]:
+            try:
+                async for event in stream:
+                    delta = getattr(event, "delta", None)
+                    if (
+                        event.type == "content_block_delta"
+                        and delta.type == "text_delta"
+                    ):
+                        yield delta.text
+            finally:
+                await stream.close()  # Consumer stopped early -> drop the connection
+
+        return deltas()
+
+
+# Provider factories: name -> (class, settings attr for the key, settings attr for the
+# model, settings attr for a custom endpoint or None)
+_PROVIDER_SPECS: Dict[str, Tuple[Any, str, str, Optional[str]]] = {
+    "gemini": (GeminiProvider, "gemini_api_key", "gemini_model", None),
+    "openai": (OpenAIProvider, "openai_api_key", "openai_model", "openai_base_url"),
+    "anthropic": (AnthropicProvider, "anthropic_api_key", "anthropic_model", None),
+}
+
+
+# A replaced provider's client is closed this long after the swap, once calls already
+# running on it (timeouts + retries) have finished
+_RETIRE_AFTER_S = 120.0
+
+
+async def _close_client(provider: Any) -> None:
+    """Close a provider's SDK client (connection pool), best effort."""
+    close = getattr(getattr(provider, "client", None), "close", None)
+    if close is not None:
+        try:
+            await close()
+        except Exception:
+            pass  # Best effort: the pool is being discarded anyway
+
+
+class ProviderRegistry:
+    """
+    Process-wide provider instances keyed by name. Each provider (and its SDK client,
+    connection pool, genai config) is built once and reused across requests; it is
+    rebuilt only when its configured key, model or endpoint changes, and the replaced
+    client is closed after a grace period.
+    """
+
+    def __init__(self) -> None:
+        # name -> ((api_key, model, base_url), provider instance)
+        self._entries: Dict[str, Tuple[Tuple[str, str, Optional[str]], Any]] = {}
+        self._retired: List[Any] = []  # Replaced providers not closed yet
+        self._closers: Set["asyncio.Task[None]"] = set()  # Delayed closes (strong refs)
+
+    def _retire(self, provider: Any) -> None:
+        """Schedule closing a replaced provider's client (aclose() closes the rest)."""
+        self._retired.append(provider)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Called outside the event loop: left to aclose()
+        task = loop.create_task(self._close_later(provider))
+        self._closers.add(task)
+        task.add_done_callback(self._closers.discard)
+
+    async def _close_later(self, provider: Any) -> None:
+        await asyncio.sleep(_RETIRE_AFTER_S)
+        if provider in self._retired:
+            self._retired.remove(provider)
+            metrics.inc("llm_clients_closed")
+            await _close_client(provider)
+
+    def providers(self, s: Settings) -> list[Tuple[str, Any]]:
+        """Ordered (name, instance) pairs for every configured provider in `s`."""
+        out: list[Tuple[str, Any]] = []
+        for name in s.llm_order:  # Iterate configured order
+            spec = _PROVIDER_SPECS.get(name)
+            if spec is None:  # Unknown name in LLM_ORDER
+                continue
+            cls, key_attr, model_attr, url_attr = spec
+            api_key, model = getattr(s, key_attr), getattr(s, model_attr)
+            base_url = getattr(s, url_attr) if url_attr else None
+            if not api_key:  # Provider not configured
+                continue
+            config = (api_key, model, base_url)
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != config:  # New or changed config
+                try:
+                    extra = {"base_url": base_url} if base_url else {}
+                    entry = (config, cls(api_key, model, **extra))
+                except Exception:  # e.g. SDK not installed -> skip this provider
+                    metrics.inc("llm_provider_init_errors")
+                    continue
+                old = self._entries.get(name)
+                if old is not None:  # Config changed: don't leak the old pool
+                    self._retire(old[1])
+                self._entries[name] = entry
+            out.append((name, entry[1]))
+        return out
+
+    async def aclose(self) -> None:
+        """Close SDK clients (connection pools) and forget all instances."""
+        for task in list(self._closers):  # Shutting down: close retirees right away
+            task.cancel()
+        for provider in [p for _, p in self._entries.values()] + self._retired:
+            await _close_client(provider)
+        self._entries.clear()
+        self._retired.clear()
+
+
+# Global registry (one per worker process)
+registry = ProviderRegistry()
+
 
 # High-level router that selects the first available provider
 class LLMRouter:
@@ -222,52 +462,166 @@ class LLMRouter:
 
     def __init__(self, settings: Settings):  # Initialize with our Settings instance
         self.s = settings  # Keep settings for access to keys, models, and order
+        self.stream_complete = False  # Last stream_pois ran to the end of a response
 
     def _providers(
         self,
-    ) -> list[Tuple[str, Any]]:  # Build an ordered list of (name, instance) pairs
-        providers: list[Tuple[str, Any]] = []  # Start with empty list
-        for name in self.s.llm_order:  # Iterate configured order
-            if name == "gemini" and self.s.gemini_api_key:  # If gemini is configured
-                providers.append(
-                    (
-                        "gemini",
-                        GeminiProvider(self.s.gemini_api_key, self.s.gemini_model),
-                    )
-                )  # Add Gemini
-            if name == "openai" and self.s.openai_api_key:  # If openai is configured
-                providers.append(
-                    (
-                        "openai",
-                        OpenAIProvider(self.s.openai_api_key, self.s.openai_model),
-                    )
-                )  # Add OpenAI
-            if (
-                name == "anthropic" and self.s.anthropic_api_key
-            ):  # If anthropic is configured
-                providers.append(
-                    (
-                        "anthropic",
-                        AnthropicProvider(
-                            self.s.anthropic_api_key, self.s.anthropic_model
-                        ),
+    ) -> list[Tuple[str, Any]]:  # Ordered (name, instance) pairs, reused across calls
+        return registry.providers(self.s)
+
+    async def _call(
+        self,
+        name: str,
+        provider: Any,
+        city: str,
+        preferences: list[str],
+        days: int,
+        budget: float,
+    ) -> Dict[str, Any]:
+        """Call one provider, record its latency, and enforce the minimal schema."""
+        t0 = time.perf_counter()
+        with span("llm_call", provider=name, model=getattr(provider, "model", None)):
+            data = await limited(
+                f"llm_{name}",
+                lambda: provider.generate_pois(city, preferences, days, budget),
+                is_rate_limited=is_rate_limited,
+            )
+            if not (isinstance(data, dict) and "pois" in data):  # Verify minimal schema
+                raise ValueError(f"{name} returned JSON without 'pois'")
+        metrics.observe(
+            f"llm_{name}", time.perf_counter() - t0
+        )  # Successful calls only
+        return data
+
+    def _hedge_delay(self, name: str) -> float:
+        """Seconds to wait on `name` before racing the next provider (its recent p-latency)."""
+        p = metrics.percentile(f"llm_{name}", self.s.llm_hedge_percentile)
+        if p is None:  # Not enough history yet
+            return self.s.llm_hedge_default_delay
+        return max(self.s.llm_hedge_min_delay, p)
+
+    async def _generate_hedged(
+        self,
+        providers: list[Tuple[str, Any]],
+        city: str,
+        preferences: list[str],
+        days: int,
+        budget: float,
+    ) -> Dict[str, Any]:
+        """
+        Start the primary; if it has not answered within its hedge delay (or it failed),
+        start the next provider too. First valid response wins, the rest are cancelled.
+        """
+        pending: Dict[asyncio.Task, str] = {}  # In-flight task -> provider name
+        queue = list(providers)  # Providers not started yet
+        last_error: Optional[Exception] = None
+
+        def launch() -> str:
+            name, provider = queue.pop(0)
+            task = asyncio.create_task(
+                self._call(name, provider, city, preferences, days, budget)
+            )
+            pending[task] = name
+            return name
+
+        current = launch()
+        try:
+            while pending:
+                timeout = self._hedge_delay(current) if queue else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:  # Slow primary -> hedge with the next provider
+                    metrics.inc("llm_hedges")
+                    current = launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()  # Winner; finally cancels the others
+                    last_error = task.exception()  # type: ignore[assignment]
+                if not pending and queue:  # Everything in flight failed -> fall back
+                    metrics.inc("llm_fallbacks")
+                    current = launch()
+        finally:
+            for task in pending:  # Losers (or everything, if we were cancelled)
+                task.cancel()
+        raise RuntimeError(f"All LLM providers failed. Last error: {last_error}")
+
+    async def stream_pois(
+        self, city: str, preferences: list[str], days: int, budget: float
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streamed generate_pois: yield each POI object as soon as the provider has
+        finished writing it. Providers are tried in order until one produces POIs;
+        once POIs were yielded there is no fallback (they can't be taken back), so a
+        stream that breaks midway just ends and `stream_complete` stays False.
+        Not hedged: racing streams would double the token cost of every request.
+        """
+        self.stream_complete = False
+        last_error: Optional[Exception] = None
+        for idx, (name, provider) in enumerate(self._providers()):
+            if idx:
+                metrics.inc("llm_fallbacks")
+            t0 = time.perf_counter()
+            parser = PoiStreamParser()
+            try:
+                # Span + limiter cover opening the stream (429s surface there); a span
+                # held across the yields below would adopt the consumer's spans
+                with span(
+                    "llm_call", provider=name, model=getattr(provider, "model", None)
+                ):
+                    deltas = await limited(
+                        f"llm_{name}",
+                        lambda: provider.open_stream(city, preferences, days, budget),
+                        is_rate_limited=is_rate_limited,
                     )
-                )  # Add Claude
-        return providers  # Return the ordered list
+                try:
+                    async for text in deltas:
+                        for poi in parser.feed(text):
+                            if parser.count == 1:  # First POI -> verification starts
+                                metrics.record(
+                                    "llm_first_poi", time.perf_counter() - t0
+                                )
+                            yield poi
+                finally:
+                    await deltas.aclose()  # Closes the HTTP stream if we stop early
+                if not parser.count:  # Valid JSON the parser didn't recognise
+                    data = _force_json(parser.text)
+                    if not isinstance(data, dict) or "pois" not in data:
+                        raise ValueError(f"{name} returned JSON without 'pois'")
+                    for poi in data["pois"]:
+                        yield poi
+            except Exception as e:  # Network, invalid JSON, quota, ...
+                if parser.count:  # Partial list already handed out
+                    metrics.inc("llm_stream_truncated")
+                    return
+                last_error = e
+                continue
+            metrics.observe(f"llm_{name}", time.perf_counter() - t0)
+            self.stream_complete = True
+            return
+        raise RuntimeError(f"All LLM providers failed. Last error: {last_error}")
 
-    def generate_pois(
+    async def generate_pois(
         self, city: str, preferences: list[str], days: int, budget: float
     ) -> Dict[str, Any]:
         """Try providers in order and return the first valid JSON response with 'pois'."""
+        providers = self._providers()
+        if self.s.llm_hedge and len(providers) > 1:  # Race slow providers
+            return await self._generate_hedged(
+                providers, city, preferences, days, budget
+            )
+
         last_error: Optional[Exception] = None  # Keep last error for diagnostics
-        for name, provider in self._providers():  # Iterate over available providers
+        for idx, (name, provider) in enumerate(providers):  # Iterate in order
+            if idx:
+                metrics.inc("llm_fallbacks")
             try:
-                data = provider.generate_pois(
-                    city, preferences, days, budget
-                )  # Call provider
-                if isinstance(data, dict) and "pois" in data:  # Verify minimal schema
-                    return data  # Return on success
+                return await self._call(name, provider, city, preferences, days, budget)
             except Exception as e:  # Catch errors (network, invalid JSON, quota, etc.)
+                # CancelledError is a BaseException: a cancelled request stops here
+                # instead of falling through to the next provider (tenacity skips it too)
                 last_error = e  # Record error and continue to next provider
         # If we reach here, no provider succeeded; raise a helpful error
         raise RuntimeError(f"All LLM providers failed. Last error: {last_error}")
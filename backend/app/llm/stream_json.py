@@ -0,0 +1,91 @@
+# Purpose: Incremental JSON parsing of streamed LLM output ({"pois": [{...}, ...]})
+# - feed() takes text deltas as they arrive and returns every POI object that closed
+#   in them, so verification can start on the first POI instead of the last token.
+# - Only string/escape state and a bracket stack are tracked per character; each
+#   finished object is handed to json.loads on its own slice.
+# - Only the objects of the top-level "pois" array are returned (other arrays, e.g. a
+#   "tips" list, are ignored); a bare top-level array ([{...}]) is accepted too.
+# - Leading noise (code fences, prose) is skipped.
+import json  # Finished object slices
+from typing import Any, Dict, List, Optional  # Typing helpers
+
+
+class PoiStreamParser:
+    """Yields the objects of the "pois" array (or a bare array) as each closes."""
+
+    def __init__(self) -> None:
+        self.text = (
+            ""  # Everything received so far (also used for the full-text fallback)
+        )
+        self._pos = 0  # Next character to scan
+        self._stack: List[str] = []  # Open "{" / "[" brackets
+        self._in_string = False
+        self._escaped = False
+        self._str_start = -1  # Opening quote of the string being read
+        self._key: Optional[str] = (
+            None  # Last string read directly inside the top-level object
+        )
+        self._in_pois = False  # Inside the top-level object's "pois" array
+        self._obj_start = -1  # Start index of the POI object being read
+        self._obj_depth = 0  # Stack depth outside that object
+        self.count = 0  # Objects returned so far
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add a text delta; return the POI objects it completed (possibly none)."""
+        self.text += chunk
+        out: List[Dict[str, Any]] = []
+        text, stack = self.text, self._stack
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+                    if stack == ["{"]:  # A key (or value) of the top-level object
+                        self._key = _string(text[self._str_start : i + 1])
+                continue
+            if not stack and c not in "{[":
+                continue  # Before the document (fences, prose) or after it
+            if c == '"':
+                self._in_string, self._str_start = True, i
+            elif c in "{[":
+                if c == "[" and stack == ["{"]:
+                    # The last string before a value is its key: {"pois": [
+                    self._in_pois = self._key == "pois"
+                # A POI: an object directly inside {"pois": [ or a bare [
+                if c == "{" and (
+                    stack == ["["] or (stack == ["{", "["] and self._in_pois)
+                ):
+                    self._obj_start, self._obj_depth = i, len(stack)
+                stack.append(c)
+            elif c in "}]":
+                if not stack:
+                    continue
+                stack.pop()
+                if self._obj_start >= 0 and len(stack) == self._obj_depth:
+                    obj = self._decode(text[self._obj_start : i + 1])
+                    self._obj_start = -1
+                    if obj is not None:
+                        out.append(obj)
+        self._pos = len(text)
+        self.count += len(out)
+        return out
+
+    @staticmethod
+    def _decode(fragment: str) -> Any:
+        try:
+            obj = json.loads(fragment)
+        except ValueError:
+            return None  # Malformed object: skip it, keep parsing the rest
+        return obj if isinstance(obj, dict) else None
+
+
+def _string(literal: str) -> Optional[str]:
+    """Value of a JSON string literal (None if malformed)."""
+    try:
+        return json.loads(literal)
+    except ValueError:
+        return None
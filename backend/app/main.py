@@ -1,11 +1,69 @@
 # Purpose: App entrypoint and HTTP routes
-from fastapi import FastAPI
+import asyncio
+import hmac
+import json
+import signal
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from loguru import logger
+
+from .models import BatchPlanRequest, PlanRequest, Itinerary
+from .orchestrator import build_itinerary, build_itinerary_shared
+from .batch import run_batch
+from .tools.http import start_http_client, close_http_client
+from .llm.provider import registry
+from .settings import get_settings, reload_settings
+from .utils.place_store import get_place_store, close_place_store
+from .utils.poi_index import close_poi_index
+from .utils.metrics import metrics
+from .utils.tracing import start_trace, stage_summary
+
+
+def _apply_reload() -> None:
+    """Swap in freshly parsed settings; LLM clients whose key/model changed are rebuilt."""
+    try:
+        settings = reload_settings()
+    except Exception:
+        # Invalid config -> keep serving with the previous settings, but say so
+        logger.exception("SIGHUP settings reload rejected; keeping previous settings")
+        return
+    registry.providers(settings)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Settings are parsed once here and shared by every request
+    settings = reload_settings()
+    # One pooled HTTP client per worker process, shared by all adapters
+    await start_http_client(settings)
+    registry.providers(settings)  # Build LLM clients once, before the first request
+    try:
+        store = get_place_store()  # Open (and create) the persistent place store
+        if store is not None:
+            await asyncio.to_thread(
+                store.prune
+            )  # Drop rows that expired while we were down
+    except Exception:  # Unwritable data/, locked or corrupt file: serve without it
+        logger.exception("Place store unavailable; using the memory cache only")
+    try:  # `kill -HUP <pid>` reloads configuration without a restart (Unix only)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _apply_reload)
+    except (NotImplementedError, AttributeError, RuntimeError):
+        pass
+    try:
+        yield
+    finally:
+        await registry.aclose()
+        await close_http_client()
+        close_place_store()
+        close_poi_index()
 
-from .models import PlanRequest, Itinerary
-from .orchestrator import build_itinerary
 
-app = FastAPI(title="Travel Planner AI Backend")
+app = FastAPI(title="Travel Planner AI Backend", lifespan=lifespan)
 
 # Dev-friendly CORS; restrict in production
 app.add_middleware(
@@ -17,6 +75,41 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Trace /api requests: every metrics.timer block and outbound call below becomes a
+    span. Slow requests log their span tree as one JSON line; DEBUG_TIMING_HEADER adds
+    a per-stage breakdown header. Streaming responses outlive call_next -> not traced.
+    """
+    path = request.url.path
+    if not path.startswith("/api/") or path.endswith(("/stream", "/batch")):
+        return await call_next(request)
+
+    s = get_settings()
+    with start_trace(f"{request.method} {path}") as root:
+        response = await call_next(request)
+        root.attrs["status_code"] = response.status_code
+
+    if s.debug_timing_header:
+        response.headers["X-Debug-Timing"] = stage_summary(root)
+    if root.duration_ms >= s.slow_request_ms:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_request",
+                    "path": path,
+                    "status_code": response.status_code,
+                    "duration_ms": round(root.duration_ms, 1),
+                    "ts": time.time(),
+                    "trace": root.to_dict(root.start),
+                },
+                default=str,
+            )
+        )
+    return response
+
+
 @app.get("/")
 async def root():
     return {
@@ -31,7 +124,92 @@ async def health():
     return {"ok": True}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    # Prometheus scrape target: stage latency histograms, counters, cumulative timings
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.post("/admin/settings/reload")
+async def admin_reload_settings(x_admin_token: Optional[str] = Header(default=None)):
+    # Disabled unless ADMIN_TOKEN is configured; then the header must match
+    token = get_settings().admin_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Constant-time comparison: response timing must not reveal a matching prefix
+    if not hmac.compare_digest((x_admin_token or "").encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        settings = reload_settings()
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid settings: {e}")
+    registry.providers(settings)
+    return {"ok": True, "env": settings.env}
+
+
 @app.post("/api/agent/plan", response_model=Itinerary)
 async def plan_trip(req: PlanRequest):
-    itinerary = await build_itinerary(req.dict())
+    # Identical concurrent requests share one pipeline run (see PLAN_CACHE_TTL)
+    with metrics.timer("plan"):
+        itinerary = await build_itinerary_shared(req.dict())
     return itinerary
+
+
+def _ndjson(event: str, data: Any) -> bytes:
+    return (json.dumps({"event": event, "data": data}, default=str) + "\n").encode()
+
+
+async def _plan_events(req: PlanRequest) -> AsyncIterator[bytes]:
+    """
+    Run the pipeline in a task and relay its progress events as NDJSON lines:
+    accepted -> poi* -> candidates -> day* -> budget -> itinerary (or error).
+    """
+    events: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+    task = asyncio.ensure_future(
+        build_itinerary(req.dict(), emit=lambda e, d: events.put_nowait(_ndjson(e, d)))
+    )
+    task.add_done_callback(lambda _: events.put_nowait(None))  # End of stream
+    try:
+        # First byte right away, before any upstream call returns
+        yield _ndjson("accepted", {"city": req.city, "days": req.days})
+        while (line := await events.get()) is not None:
+            yield line
+        try:
+            itinerary: Dict[str, Any] = Itinerary(**task.result()).dict()
+        except Exception as e:
+            yield _ndjson("error", {"detail": str(e)})
+        else:
+            yield _ndjson("itinerary", itinerary)
+    finally:
+        # Client went away (or the response was aborted): stop remaining upstream calls
+        if not task.done():
+            task.cancel()
+
+
+@app.post("/api/agent/plan/stream")
+async def plan_trip_stream(req: PlanRequest):
+    # One JSON object per line, flushed as each stage finishes (see _plan_events)
+    return StreamingResponse(
+        _plan_events(req),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _batch_lines(req: BatchPlanRequest) -> AsyncIterator[bytes]:
+    async for event in run_batch(req.requests):
+        yield (json.dumps(event, default=str) + "\n").encode()
+
+
+@app.post("/api/agent/plan/batch")
+async def plan_trip_batch(req: BatchPlanRequest):
+    # Many plans, shared lookups, one NDJSON line per itinerary + a final summary
+    if len(req.requests) > get_settings().batch_max_items:
+        raise HTTPException(status_code=413, detail="Batch too large")
+    return StreamingResponse(
+        _batch_lines(req),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
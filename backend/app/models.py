@@ -15,9 +15,10 @@ class Cost(BaseModel):
 
 
 class Transport(BaseModel):
-    mode: Literal["walk", "metro", "bus", "car", "train", "flight"]
+    mode: Literal["walk", "metro", "bus", "car", "train", "flight", "transit"]
     duration_min: int
     distance_km: Optional[float] = None
+    estimated: Optional[bool] = None  # True when Directions failed and we guessed
 
 
 class POI(BaseModel):
@@ -76,3 +77,7 @@ class PlanRequest(BaseModel):
     preferences: List[str] = []
     travelers: Optional[int] = 1
     currency: str = "USD"
+
+
+class BatchPlanRequest(BaseModel):
+    requests: List[PlanRequest]
@@ -1,14 +1,40 @@
 # Purpose: Build a multi-day grounded itinerary with budgeting and notes
-from typing import Dict, Any, List  # Typing helpers
+import asyncio  # Concurrent pipeline stages
+import copy  # Per-caller copies of shared results
+import time  # Stage timing
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional  # Typing helpers
 from math import ceil  # For bucket sizing
 
-from .agents.planner_llm import llm_poi_candidates  # LLM candidates
+from .agents.planner_llm import (  # LLM candidates
+    candidate_target,
+    day_bucket,
+    llm_poi_candidate_stream,
+)
 from .agents.verifier import verify_pois  # Google Maps verification
-from .agents.router import route_day  # Directions estimates
-from .agents.budget import estimate_budget  # Budget totals
+from .agents.router import route_days  # Directions estimates
+from .agents.geoplan import plan_days  # Geographic day clustering + ordering
+from .agents.budget import estimate_budget, quote_lodging  # Budget totals
 from .utils.dates import normalize_start_date, expand_dates  # Date utils
-from .settings import Settings  # Thresholds and defaults
+from .settings import Settings, get_settings  # Thresholds and defaults
 from .utils.metrics import metrics  # Timing metrics
+from .utils.cache import TTLCache  # Plan result cache + single-flight
+from .utils.poi_index import get_poi_index, index_categories, index_key  # Hot cities
+from .utils.spatial import dedupe_places  # Near-duplicates across categories
+
+# Baseline candidates if the LLM is down or returns nothing
+_FALLBACK_CANDIDATES = [
+    "City Museum",
+    "Central Park",
+    "Old Town",
+    "Main Cathedral",
+    "Local Market",
+]
+
+# Progress callback: emit(event, data) as pipeline stages finish (see /api/agent/plan/stream)
+Emit = Callable[[str, Any], None]
+
+# Whole-itinerary results, shared by identical concurrent (and very recent) requests
+_plan_cache: Optional[TTLCache] = None  # Created from settings on first use
 
 
 def _distribute_across_days(
@@ -34,16 +60,95 @@ def _distribute_across_days(
     return buckets
 
 
-async def build_itinerary(req: Dict[str, Any]) -> Dict[str, Any]:
+def _enough_pois(days: int, s: Settings) -> Optional[int]:
+    """Verified POIs that fill the trip (TARGET_PER_DAY per day); None = no cap."""
+    return days * s.target_per_day if s.target_per_day > 0 else None
+
+
+async def _indexed_pois(
+    req: Dict[str, Any], days: int, s: Settings
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Verified POIs for a hot city from the precomputed index, or None (cold city,
+    stale entry, index disabled or unreadable) to plan live.
+    Categories are interleaved so every preference is represented, then the list is
+    cut to the size the live path would have asked the LLM for.
+    Entries are budget-agnostic: unlike the live candidate cache (keyed by budget
+    tier) every budget gets the same POIs; the budget only shapes the estimate.
+    """
+    bucket = day_bucket(days)
+    try:
+        # Opening can fail too (unwritable data/, locked or corrupt file)
+        index = get_poi_index()
+        if index is None:
+            return None
+        per_category = await index.lookup(
+            index_key(req.get("city", ""), req.get("country")),
+            index_categories(req.get("preferences")),
+            bucket,
+            s.poi_index_max_age_days * 86400,
+        )
+    except Exception:  # Fail-soft: a broken index must not break planning
+        metrics.inc("poi_index_errors")
+        return None
+    if per_category is None:
+        metrics.inc("poi_index_misses")
+        return None
+
+    pois: List[Dict[str, Any]] = []
+    seen = set()
+    for rank in range(max(len(c) for c in per_category)):  # Round-robin categories
+        for category in per_category:
+            if rank >= len(category):
+                continue
+            poi = category[rank]
+            rating = poi.get("rating")
+            if poi["place_id"] in seen:
+                continue
+            if isinstance(rating, (int, float)) and rating < s.min_rating:
+                continue  # Same filter as live verification (MIN_RATING may change)
+            seen.add(poi["place_id"])
+            pois.append(poi)
+    if not pois:
+        metrics.inc("poi_index_misses")
+        return None
+    metrics.inc("poi_index_hits")
+    pois = dedupe_places(pois, s.dedup_radius_m, s.dedup_name_similarity)
+    return pois[: _enough_pois(days, s) or candidate_target(bucket)]
+
+
+def _no_emit(event: str, data: Any) -> None:
+    pass
+
+
+def _emit_budget(emit: Emit, itinerary: Dict[str, Any]) -> None:
+    emit(
+        "budget",
+        {
+            "totals": itinerary["totals"],
+            "budget_explain": itinerary.get("budget_explain"),
+        },
+    )
+
+
+async def build_itinerary(
+    req: Dict[str, Any], emit: Optional[Emit] = None
+) -> Dict[str, Any]:
     """
     Pipeline:
       1) Normalize & expand dates.
-      2) LLM candidates (many) -> Verify via Google (filter by rating).
+      2) LLM candidates (many) -> Verify via Google (filter by rating); hot cities
+         read already-verified POIs from the precomputed index instead.
       3) Distribute POIs across days and add routing per day.
       4) Compute budget with real provider or heuristics.
       5) Add notes & uncertainties for explainability.
+    Stages overlap where their inputs allow: the hotel quote (city + dates only) starts
+    immediately, and each candidate is verified as soon as the LLM yields it.
+    `emit` receives progress events: poi (each verified POI), candidates (once
+    verification is done), day (each routed day) and budget.
     """
-    s = Settings()  # Load thresholds
+    emit = emit or _no_emit
+    s = get_settings()  # Shared settings, injected into every stage below
     # 1) Normalize and expand dates
     start_iso = normalize_start_date(req.get("start_date"))  # Ensure YYYY-MM-DD
     days = int(req.get("days", 3))  # Duration in days
@@ -74,23 +179,38 @@ async def build_itinerary(req: Dict[str, Any]) -> Dict[str, Any]:
         "uncertainties": [],
     }
 
-    # 2) LLM → candidates (untrusted)
-    with metrics.timer("llm_candidates"):
-        candidates: List[str] = await llm_poi_candidates(req)
-
-    if not candidates:
-        # Fallback baseline if LLM is down or empty response
-        candidates = [
-            "City Museum",
-            "Central Park",
-            "Old Town",
-            "Main Cathedral",
-            "Local Market",
-        ]
+    # Lodging depends only on city + dates: start the quote now, await it at step 4
+    hotel = asyncio.ensure_future(quote_lodging(city, start_iso, days, settings=s))
+    hotel.add_done_callback(lambda t: t.cancelled() or t.exception())
+    try:
+        return await _fill_itinerary(req, itinerary, hotel, emit, s)
+    finally:
+        if not hotel.done():  # Failed/cancelled before the budget step
+            hotel.cancel()
 
-    # Verify via Google Maps (trusted)
-    with metrics.timer("verify_pois"):
-        verified = await verify_pois(candidates, city)
+
+async def _fill_itinerary(
+    req: Dict[str, Any],
+    itinerary: Dict[str, Any],
+    hotel: "asyncio.Future[Dict[str, Any]]",
+    emit: Emit,
+    s: Settings,
+) -> Dict[str, Any]:
+    """Steps 2-5 of build_itinerary, filling the itinerary shell in place."""
+    city = itinerary["trip"]["city"]
+    days = itinerary["trip"]["days"]
+    currency = itinerary["trip"]["currency"]
+    dates = [d["date"] for d in itinerary["days"]]
+
+    # 2) Hot city: verified POIs straight from the precomputed index
+    with metrics.timer("poi_index"):
+        verified = await _indexed_pois(req, days, s)
+    if verified is not None:
+        for poi in verified:
+            emit("poi", poi)
+        emit("candidates", {"candidates": [p["name"] for p in verified]})
+    else:
+        verified = await _live_pois(req, city, days, emit, s)
 
     if not verified:
         itinerary["notes"].append(
@@ -98,12 +218,22 @@ async def build_itinerary(req: Dict[str, Any]) -> Dict[str, Any]:
         )
         itinerary["uncertainties"].append("No verified POIs, itinerary is skeletal.")
         # Budget still computed to give user something actionable
-        itinerary = await estimate_budget(itinerary, currency=currency)
+        itinerary = await estimate_budget(
+            itinerary, currency=currency, settings=s, hotel=await hotel
+        )
+        _emit_budget(emit, itinerary)
         return itinerary
 
-    # 3) Distribute across days and route each day
-    buckets = _distribute_across_days(verified, days)
-    for day_idx, bucket in enumerate(buckets):
+    # 3) Distribute across days (by geography unless disabled), then route all days.
+    # Buckets depend on the whole verified set (clustering / even split), so every day
+    # becomes final at the same moment; all days are then routed concurrently.
+    if s.geo_planning:
+        with metrics.timer("geo_plan"):
+            buckets = plan_days(verified, days)
+    else:
+        buckets = _distribute_across_days(verified, days)
+    day_items: List[List[Dict[str, Any]]] = []
+    for bucket in buckets:
         # Convert raw place dicts into DayItems
         items: List[Dict[str, Any]] = []
         for p in bucket:
@@ -127,17 +257,117 @@ async def build_itinerary(req: Dict[str, Any]) -> Dict[str, Any]:
                 }
             )
 
-        # Add transit estimates for that day's sequence
-        if items:
-            items = await route_day(items)
+        day_items.append(items)
 
+    # Add transit estimates for every day's sequence (legs run in parallel)
+    with metrics.timer("route_days"):
+        day_items = await route_days(
+            day_items,
+            s,
+            on_day=lambda idx, items: emit(
+                "day", {"index": idx, "date": dates[idx], "items": items}
+            ),
+        )
+    for day_idx, items in enumerate(day_items):
         itinerary["days"][day_idx]["items"] = items
 
-    # 4) Budget with hotels provider (or heuristic)
-    itinerary = await estimate_budget(itinerary, currency=currency)
+    estimated = sum(
+        1
+        for items in day_items
+        for it in items
+        if (it.get("transport") or {}).get("estimated")
+    )
+    if estimated:
+        itinerary["uncertainties"].append(
+            f"{estimated} transit leg(s) could not be routed; using straight-line estimates."
+        )
+
+    # 4) Budget with hotels provider (or heuristic); the quote has been running since step 1
+    itinerary = await estimate_budget(
+        itinerary, currency=currency, settings=s, hotel=await hotel
+    )
+    _emit_budget(emit, itinerary)
 
     # 5) Explainability notes
     itinerary["notes"].append(
         f"POIs verified via Google Maps (min rating {s.min_rating}). Transit estimates are approximate."
     )
     return itinerary
+
+
+async def _live_pois(
+    req: Dict[str, Any], city: str, days: int, emit: Emit, s: Settings
+) -> List[Dict[str, Any]]:
+    """LLM candidates (untrusted), streamed straight into Places verification."""
+    candidates: List[str] = []
+
+    async def candidate_stream() -> AsyncIterator[str]:
+        # Timed by hand: a timer span held across yields would adopt the verification
+        # spans started meanwhile (they'd nest under llm_candidates in the trace)
+        t0 = time.perf_counter()
+        async for name in llm_poi_candidate_stream(req, s):
+            candidates.append(name)
+            yield name
+        dt = time.perf_counter() - t0
+        metrics.add_time("llm_candidates", dt)
+        metrics.record("llm_candidates", dt)
+        if not candidates:
+            # Fallback baseline if LLM is down or empty response
+            candidates.extend(_FALLBACK_CANDIDATES)
+            for name in _FALLBACK_CANDIDATES:
+                yield name
+        # No emit here: once the trip is full the rest of the stream drains in the
+        # background (see verify_pois), after the response may have ended
+
+    # Verify via Google Maps (trusted); lookups start as candidates arrive and stop
+    # once the trip is full
+    with metrics.timer("verify_pois"):
+        verified = await verify_pois(
+            candidate_stream(),
+            city,
+            s,
+            on_verified=lambda poi: emit("poi", poi),
+            enough=_enough_pois(days, s),
+            country=req.get("country"),
+        )
+    emit("candidates", {"candidates": list(candidates)})  # Those seen so far
+    return verified
+
+
+def plan_key(req: Dict[str, Any]) -> str:
+    """Normalized PlanRequest: identical trips map to the same key."""
+    prefs = sorted({str(p).strip().lower() for p in (req.get("preferences") or [])})
+    return "plan:" + "|".join(
+        [
+            " ".join(str(req.get("city", "")).casefold().split()),
+            " ".join(str(req.get("country") or "").casefold().split()),
+            normalize_start_date(req.get("start_date")),
+            str(int(req.get("days", 3))),
+            f"{float(req.get('budget', 1000)):.2f}",
+            ",".join(p for p in prefs if p),
+            str(req.get("travelers") or 1),
+            str(req.get("currency", "USD")).upper(),
+        ]
+    )
+
+
+async def build_itinerary_shared(
+    req: Dict[str, Any], settings: Optional[Settings] = None
+) -> Dict[str, Any]:
+    """
+    build_itinerary with request coalescing: concurrent identical requests share one
+    pipeline run, and results are reused for PLAN_CACHE_TTL seconds.
+    Every caller receives its own deep copy of the itinerary.
+    """
+    global _plan_cache
+    s = settings or get_settings()
+    if _plan_cache is None:
+        _plan_cache = TTLCache(
+            name="plan",
+            ttl_seconds=s.plan_cache_ttl,
+            max_entries=s.plan_cache_max_entries,
+        )
+    result = await _plan_cache.get_or_set_async(
+        plan_key(req), lambda: build_itinerary(req), ttl=s.plan_cache_ttl
+    )
+    return copy.deepcopy(result)
@@ -1,20 +1,29 @@
 # Purpose: Centralized typed settings (keys, models, provider order, budget providers)
 from pydantic_settings import BaseSettings  # For typed env configuration
 from pydantic import Field  # For default/alias
-from typing import List, Optional  # Typing helpers
+from typing import List, Literal, Optional  # Typing helpers
 
 
 class Settings(BaseSettings):
     # App
     env: str = Field(default="dev", alias="ENV")  # Environment name (dev/staging/prod)
     port: int = Field(default=8000, alias="PORT")  # HTTP port
+    admin_token: Optional[str] = Field(
+        default=None, alias="ADMIN_TOKEN"
+    )  # Enables /admin/* endpoints (sent as X-Admin-Token)
 
     # Google Maps
     google_maps_key: Optional[str] = Field(default=None, alias="GOOGLE_MAPS_API_KEY")
+    google_maps_base_url: str = Field(
+        default="https://maps.googleapis.com", alias="GOOGLE_MAPS_BASE_URL"
+    )  # Overridable so benchmarks can target a local fake server
 
     # LLM providers (Sprint 2)
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", alias="OPENAI_MODEL")
+    openai_base_url: Optional[str] = Field(
+        default=None, alias="OPENAI_BASE_URL"
+    )  # OpenAI-compatible endpoint (proxies, local stand-ins for benchmarks)
 
     anthropic_api_key: Optional[str] = Field(default=None, alias="ANTHROPIC_API_KEY")
     anthropic_model: str = Field(
@@ -26,6 +35,79 @@ class Settings(BaseSettings):
 
     llm_order_raw: str = Field(default="gemini,openai,anthropic", alias="LLM_ORDER")
 
+    # In-memory response cache (hotel quotes, Places lookups)
+    cache_max_entries: int = Field(default=10_000, alias="CACHE_MAX_ENTRIES")
+    cache_max_bytes: int = Field(
+        default=64_000_000, alias="CACHE_MAX_BYTES"
+    )  # Approximate memory bound
+    place_search_ttl: int = Field(
+        default=86400, alias="PLACE_SEARCH_TTL"
+    )  # Seconds a text-search hit stays cached
+    place_detail_ttl: int = Field(
+        default=86400, alias="PLACE_DETAIL_TTL"
+    )  # Seconds a place detail stays cached
+    place_empty_ttl: int = Field(
+        default=300, alias="PLACE_EMPTY_TTL"
+    )  # Seconds an empty search / detail answer stays cached (0 = never)
+    place_store_path: str = Field(
+        default="data/place_store.sqlite3", alias="PLACE_STORE_PATH"
+    )  # Persistent SQLite place store shared by workers ("" = memory cache only)
+
+    # Precomputed POI index for hot cities (filled by `python -m app.warmup`)
+    poi_index_path: str = Field(
+        default="data/poi_index.sqlite3", alias="POI_INDEX_PATH"
+    )  # SQLite index of verified POIs per city/category ("" = always plan live)
+    poi_index_max_age_days: float = Field(
+        default=30, alias="POI_INDEX_MAX_AGE_DAYS"
+    )  # Entries older than this are cold and planned live (0 = never stale)
+
+    # Tracing: span trees for slow requests, optional timing header
+    slow_request_ms: float = Field(
+        default=5000, alias="SLOW_REQUEST_MS"
+    )  # Log the span tree of API requests slower than this (0 = log every request)
+    debug_timing_header: bool = Field(
+        default=False, alias="DEBUG_TIMING_HEADER"
+    )  # Add X-Debug-Timing (per-stage ms) to API responses
+
+    # Batch generation (POST /api/agent/plan/batch, python -m app.batch)
+    batch_concurrency: int = Field(
+        default=8, alias="BATCH_CONCURRENCY"
+    )  # Itineraries in flight across all batches (one process-wide budget)
+    batch_max_items: int = Field(
+        default=5000, alias="BATCH_MAX_ITEMS"
+    )  # Largest batch the HTTP endpoint accepts
+
+    # Plan coalescing: identical concurrent requests share one pipeline run
+    plan_cache_ttl: int = Field(
+        default=30, alias="PLAN_CACHE_TTL"
+    )  # Seconds a finished itinerary is reused (0 = coalesce in-flight only)
+    plan_cache_max_entries: int = Field(default=500, alias="PLAN_CACHE_MAX_ENTRIES")
+
+    # LLM candidate cache (keyed by normalized city/preferences/day+budget buckets)
+    llm_cache_enabled: bool = Field(default=True, alias="LLM_CACHE_ENABLED")
+    llm_cache_ttl: int = Field(default=86400, alias="LLM_CACHE_TTL")  # Seconds
+    llm_cache_max_entries: int = Field(default=2000, alias="LLM_CACHE_MAX_ENTRIES")
+    llm_cache_max_bytes: int = Field(
+        default=8_000_000, alias="LLM_CACHE_MAX_BYTES"
+    )  # Approximate memory bound
+
+    # Streamed completions: each POI is verified as soon as the model has written it
+    llm_streaming: bool = Field(
+        default=True, alias="LLM_STREAMING"
+    )  # Providers are tried in order (no hedging) while streaming
+
+    # Hedged LLM requests: race the next provider when the current one is slow
+    llm_hedge: bool = Field(default=False, alias="LLM_HEDGE")
+    llm_hedge_percentile: float = Field(
+        default=0.9, alias="LLM_HEDGE_PERCENTILE"
+    )  # Hedge after the provider's recent p90 latency
+    llm_hedge_default_delay: float = Field(
+        default=4.0, alias="LLM_HEDGE_DEFAULT_DELAY"
+    )  # Seconds, used until a provider has enough latency history
+    llm_hedge_min_delay: float = Field(
+        default=0.5, alias="LLM_HEDGE_MIN_DELAY"
+    )  # Never hedge sooner than this (seconds)
+
     # Budget (Sprint 3): generic hotel pricing provider (RapidAPI / custom)
     hotel_api_key: Optional[str] = Field(
         default=None, alias="HOTEL_API_KEY"
@@ -47,10 +129,78 @@ class Settings(BaseSettings):
     )
     default_misc_per_day: float = Field(default=15.0, alias="DEFAULT_MISC_PER_DAY")
 
+    # Shared outbound HTTP client (Maps + hotel adapters)
+    http_timeout: float = Field(default=20.0, alias="HTTP_TIMEOUT")  # Seconds per call
+    http_connect_timeout: float = Field(
+        default=5.0, alias="HTTP_CONNECT_TIMEOUT"
+    )  # Seconds to establish a connection
+    http_max_connections: int = Field(
+        default=100, alias="HTTP_MAX_CONNECTIONS"
+    )  # Hard cap on open sockets per process
+    http_max_keepalive: int = Field(
+        default=20, alias="HTTP_MAX_KEEPALIVE"
+    )  # Idle connections kept warm in the pool
+    http_keepalive_expiry: float = Field(
+        default=30.0, alias="HTTP_KEEPALIVE_EXPIRY"
+    )  # Seconds before an idle connection is closed
+    http2: bool = Field(default=True, alias="HTTP2")  # Requires httpx[http2]
+
+    # Upstream rate limits: token bucket (QPS + burst) + AIMD concurrency ceiling each
+    rate_limit_enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
+    maps_qps: float = Field(default=50.0, alias="MAPS_QPS")  # <= 0 disables the bucket
+    maps_burst: int = Field(default=20, alias="MAPS_BURST")
+    maps_max_concurrency: int = Field(default=32, alias="MAPS_MAX_CONCURRENCY")
+    hotels_qps: float = Field(default=5.0, alias="HOTELS_QPS")
+    hotels_burst: int = Field(default=5, alias="HOTELS_BURST")
+    hotels_max_concurrency: int = Field(default=4, alias="HOTELS_MAX_CONCURRENCY")
+    llm_qps: float = Field(default=5.0, alias="LLM_QPS")  # Per provider
+    llm_burst: int = Field(default=5, alias="LLM_BURST")
+    llm_max_concurrency: int = Field(default=16, alias="LLM_MAX_CONCURRENCY")
+    upstream_retries: int = Field(
+        default=4, alias="UPSTREAM_RETRIES"
+    )  # Retries for 429 / OVER_QUERY_LIMIT answers
+    upstream_backoff_s: float = Field(
+        default=0.5, alias="UPSTREAM_BACKOFF"
+    )  # First backoff delay (seconds), doubled per retry
+
+    # Routing
+    route_concurrency: int = Field(
+        default=16, alias="ROUTE_CONCURRENCY"
+    )  # Max in-flight Directions calls per process
+    route_cache_ttl: int = Field(
+        default=86400, alias="ROUTE_CACHE_TTL"
+    )  # Seconds a Directions leg stays cached (keyed by place ids / ~50 m grid)
+    routing_backend: Literal["directions", "matrix"] = Field(
+        default="directions", alias="ROUTING_BACKEND"
+    )  # Per-leg Directions calls, or one Distance Matrix request per day
+
+    # Day planning
+    geo_planning: bool = Field(
+        default=True, alias="GEO_PLANNING"
+    )  # Cluster POIs into days by location + order each day (else round-robin)
+
     # Verifier thresholds
     min_rating: float = Field(
         default=3.9, alias="MIN_RATING"
     )  # Filter out low-rated POIs
+    verify_concurrency: int = Field(
+        default=8, alias="VERIFY_CONCURRENCY"
+    )  # Max in-flight verification lookups per process
+    target_per_day: int = Field(
+        default=3, alias="TARGET_PER_DAY"
+    )  # Stop verifying once days * this POIs passed (0 = verify every candidate)
+    candidate_fuzzy_threshold: float = Field(
+        default=0.8, alias="CANDIDATE_FUZZY_THRESHOLD"
+    )  # 0..1 similarity of differing words at which LLM candidates are one place
+    city_radius_km: float = Field(
+        default=50.0, alias="CITY_RADIUS_KM"
+    )  # Bias searches to this radius around the learned city centre (0 = no bias)
+    dedup_radius_m: float = Field(
+        default=75.0, alias="DEDUP_RADIUS_M"
+    )  # Verified POIs this close with similar names are merged
+    dedup_name_similarity: float = Field(
+        default=0.6, alias="DEDUP_NAME_SIMILARITY"
+    )  # 0..1 name similarity needed to merge nearby POIs
 
     @property
     def llm_order(self) -> List[str]:
@@ -60,3 +210,26 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+
+
+# Process-wide settings: parsed/validated once, read on hot paths without re-parsing .env
+_current: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """Return the shared Settings (loaded on first use, normally at startup)."""
+    s = _current
+    if s is None:
+        s = reload_settings()
+    return s
+
+
+def reload_settings() -> Settings:
+    """
+    Re-read env/.env and swap the shared Settings in one reference assignment.
+    Validation happens first, so a bad config leaves the current settings in place.
+    """
+    global _current
+    fresh = Settings()
+    _current = fresh
+    return fresh
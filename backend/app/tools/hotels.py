@@ -4,30 +4,48 @@
 # Note: Replace with a real provider (e.g., RapidAPI Skyscanner/Hotels) when credentials are available.
 
 from typing import Optional, Dict, Any  # Typing helpers
-import httpx  # HTTP client
-from ..settings import Settings  # Settings to read provider keys
-from ..utils.cache import cache  # Simple TTL cache
+from ..settings import Settings, get_settings  # Settings to read provider keys
+from .http import get_http_client  # Shared pooled HTTP client
+from ..utils.cache import cache  # Shared LRU/TTL cache (single-flight)
 from ..utils.metrics import metrics  # Metrics for timing
+from ..utils.tracing import span, set_attributes  # Request trace spans
+from ..utils.ratelimit import RateLimited, limited  # Hotel API quota
 
 
 async def _provider_price_nightly(
-    city: str, start_date: str, nights: int, rooms: int = 1
+    city: str,
+    start_date: str,
+    nights: int,
+    rooms: int = 1,
+    settings: Optional[Settings] = None,
 ) -> Optional[float]:
     """
     Call external hotel provider to estimate nightly price for the given city/dates.
     Return price per night (float) or None if not available.
     """
-    s = Settings()  # Load settings (keys and endpoint)
+    s = settings or get_settings()  # Shared settings (keys and endpoint)
     if not (s.hotel_api_key and s.hotel_api_host and s.hotel_api_endpoint):
         # Provider not configured -> no direct price available
         return None
 
-    # Cache key to avoid repeated calls
+    # Cache key to avoid repeated calls; concurrent misses share one provider call
     key = f"hotel:{city}:{start_date}:{nights}:{rooms}"
-    cached = cache.get(key)
-    if cached is not None:
-        return cached
+    with span("hotel_quote", city=city, nights=nights, cache_hit=True):
+        return await cache.get_or_set_async(
+            key,
+            lambda: limited(
+                "hotels",
+                lambda: _fetch_price_nightly(s, city, start_date, nights, rooms),
+            ),
+            ttl=900,
+        )
 
+
+async def _fetch_price_nightly(
+    s: Settings, city: str, start_date: str, nights: int, rooms: int
+) -> Optional[float]:
+    """Provider HTTP call + parsing (None when no usable price came back)."""
+    set_attributes(cache_hit=False)
     headers = {
         "X-RapidAPI-Key": s.hotel_api_key,  # Example: RapidAPI key header
         "X-RapidAPI-Host": s.hotel_api_host,  # Example: API host
@@ -44,11 +62,15 @@ async def _provider_price_nightly(
 
     # Make the HTTP call protected by a timer for metrics
     with metrics.timer("hotels_http"):
-        async with httpx.AsyncClient(timeout=20) as client:
-            # NOTE: s.hotel_api_endpoint should be a fully-qualified URL
-            r = await client.get(s.hotel_api_endpoint, headers=headers, params=params)
-            r.raise_for_status()
-            data = r.json()
+        # NOTE: s.hotel_api_endpoint should be a fully-qualified URL
+        r = await get_http_client().get(
+            s.hotel_api_endpoint, headers=headers, params=params
+        )
+        set_attributes(http_status=r.status_code)
+        if r.status_code == 429:  # Retried with backoff by limited("hotels", ...)
+            raise RateLimited("hotels")
+        r.raise_for_status()
+        data = r.json()
 
     # The parsing below is pseudo; adapt to actual API response fields.
     # We try to extract a sensible nightly price (e.g., median of top results).
@@ -64,11 +86,7 @@ async def _provider_price_nightly(
         prices.sort()
         nightly = prices[len(prices) // 2]
 
-    # Save to cache for subsequent calls
-    if nightly is not None:
-        cache.set(key, nightly, ttl=900)
-
-    return nightly
+    return nightly  # None is not cached by get_or_set_async
 
 
 def _heuristic_price_nightly(city: str) -> float:
@@ -89,14 +107,20 @@ def _heuristic_price_nightly(city: str) -> float:
 
 
 async def hotel_budget(
-    city: str, start_date: str, nights: int, rooms: int = 1
+    city: str,
+    start_date: str,
+    nights: int,
+    rooms: int = 1,
+    settings: Optional[Settings] = None,
 ) -> Dict[str, Any]:
     """
     Return a hotel budget breakdown:
     { "nightly": float, "nights": int, "rooms": int, "total": float, "currency": "USD", "source": "provider|heuristic" }
     """
     # First try provider price
-    nightly = await _provider_price_nightly(city, start_date, nights, rooms)
+    nightly = await _provider_price_nightly(
+        city, start_date, nights, rooms, settings=settings
+    )
     if nightly is not None:
         total = nightly * nights * rooms
         return {
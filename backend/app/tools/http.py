@@ -0,0 +1,53 @@
+# Purpose: One pooled httpx.AsyncClient per process, shared by every outbound adapter
+# - Created/closed by the FastAPI lifespan (see main.py); lazily created for scripts/benchmarks.
+# - Keep-alive + optional HTTP/2 so Maps/hotel calls reuse connections instead of
+#   paying a TCP+TLS handshake per request.
+from typing import Optional  # Typing helpers
+import httpx  # HTTP client
+from ..settings import Settings, get_settings  # Pool limits, timeouts, HTTP/2
+
+try:
+    import h2  # noqa: F401  # HTTP/2 support is optional (httpx[http2])
+
+    _HTTP2_AVAILABLE = True
+except Exception:
+    _HTTP2_AVAILABLE = False
+
+_client: Optional[httpx.AsyncClient] = None  # Process-wide client
+
+
+def build_client(s: Settings) -> httpx.AsyncClient:
+    """Create an AsyncClient configured from settings (pool limits, timeouts, HTTP/2)."""
+    return httpx.AsyncClient(
+        http2=s.http2 and _HTTP2_AVAILABLE,  # Silently fall back to HTTP/1.1 without h2
+        timeout=httpx.Timeout(s.http_timeout, connect=s.http_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=s.http_max_connections,
+            max_keepalive_connections=s.http_max_keepalive,
+            keepalive_expiry=s.http_keepalive_expiry,
+        ),
+    )
+
+
+async def start_http_client(s: Optional[Settings] = None) -> httpx.AsyncClient:
+    """Create the shared client (idempotent). Called from the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client(s or get_settings())
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and release pooled sockets."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use outside the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client(get_settings())
+    return _client
@@ -1,10 +1,58 @@
 # Purpose: Thin adapters over Google APIs to keep business logic clean
-import os
 from typing import List, Dict, Any, Optional
 
-import httpx
+from .http import get_http_client
+from ..settings import get_settings
+from ..utils.cache import cache
+from ..utils.metrics import metrics
+from ..utils.place_store import PlaceStore, get_place_store
+from ..utils.tracing import span, set_attributes
+from ..utils.ratelimit import RateLimited, limited
 
-GOOGLE_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
+
+def _key() -> str:
+    """Current Maps API key (read from the shared settings, so reloads apply)."""
+    return get_settings().google_maps_key or ""
+
+
+def _retry_after(r: Any) -> Optional[float]:
+    try:
+        return float(r.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+async def _maps_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    GET a Maps endpoint and return the JSON body, within the "maps" rate limits.
+    HTTP 429 / OVER_QUERY_LIMIT are retried with backoff, then raise RateLimited
+    (never mistaken for "no results").
+    """
+    return await limited("maps", lambda: _maps_get_once(path, params))
+
+
+async def _maps_get_once(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """One GET over the shared pooled client."""
+    s = get_settings()
+    # One latency histogram per call type: maps_textsearch, maps_details, ...
+    with metrics.timer(f"maps_{path.rstrip('/').split('/')[-2]}"):
+        r = await get_http_client().get(
+            f"{s.google_maps_base_url}{path}",
+            params={**params, "key": s.google_maps_key},
+        )
+        set_attributes(http_status=r.status_code)
+        if r.status_code == 429:
+            raise RateLimited("maps", _retry_after(r))
+        r.raise_for_status()
+        body = r.json()
+        if body.get("status") == "OVER_QUERY_LIMIT":  # Quota answer with HTTP 200
+            raise RateLimited("maps")
+        return body
+
+
+def _query_key(query: str) -> str:
+    """Normalized text-search query (casefolded, single-spaced)."""
+    return " ".join(query.casefold().split())
 
 
 async def google_place_search(
@@ -13,87 +61,218 @@ async def google_place_search(
     lng: Optional[float] = None,
     radius_m: int = 5000,
 ) -> List[Dict[str, Any]]:
-    if not GOOGLE_KEY:
+    if not _key():
         # Fail-soft for local dev without key
         return []
 
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {"query": query, "key": GOOGLE_KEY}
+    store_key = _query_key(query)
+    if lat is not None and lng is not None:
+        store_key += f"@{lat:.4f},{lng:.4f},{radius_m}"
+    # Lookup order: memory -> persistent store -> Places API
+    with span("place_search", query=store_key, cache_hit=True):
+        results = await cache.get_or_set_async(
+            f"place_search:{store_key}",
+            lambda: _stored_place_search(store_key, query, lat, lng, radius_m),
+            ttl=get_settings().place_search_ttl,
+            empty_ttl=get_settings().place_empty_ttl,  # No results: retry soon
+        )
+    return [dict(r) for r in results]  # Copies: callers may annotate results
+
+
+def _place_store() -> Optional[PlaceStore]:
+    """The persistent store, or None when disabled or unavailable (plans go on)."""
+    try:
+        return get_place_store()
+    except Exception:
+        metrics.inc("place_store_errors")  # Store trouble must not fail the plan
+        return None
+
+
+async def _stored_place_search(
+    store_key: str,
+    query: str,
+    lat: Optional[float],
+    lng: Optional[float],
+    radius_m: int,
+) -> List[Dict[str, Any]]:
+    """Text search through the persistent place store (fail-soft on store errors)."""
+    set_attributes(cache_hit=False)  # Memory miss; this request runs the lookup
+    store = _place_store()
+    if store is not None:
+        try:
+            stored = await store.get_search(store_key)
+            set_attributes(store_hit=stored is not None)
+            if stored is not None:
+                return stored
+        except Exception:
+            metrics.inc("place_store_errors")  # Store trouble must not fail the plan
+
+    results = await _fetch_place_search(query, lat, lng, radius_m)
+    if store is not None and results:  # Skip empty answers (may be transient)
+        try:
+            await store.put_search(store_key, results, get_settings().place_search_ttl)
+        except Exception:
+            metrics.inc("place_store_errors")
+    return results
+
+
+async def _fetch_place_search(
+    query: str, lat: Optional[float], lng: Optional[float], radius_m: int
+) -> List[Dict[str, Any]]:
+    params: Dict[str, Any] = {"query": query}
 
     if lat is not None and lng is not None:
         params.update({"location": f"{lat},{lng}", "radius": radius_m})
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url, params=params)
-        r.raise_for_status()
-        data = r.json().get("results", [])
+    body = await _maps_get("/maps/api/place/textsearch/json", params)
+    data = body.get("results", [])
 
-        return [
-            {
-                "name": d.get("name"),
-                "address": d.get("formatted_address"),
-                "place_id": d.get("place_id"),
-                "rating": d.get("rating"),
-                "lat": d.get("geometry", {}).get("location", {}).get("lat"),
-                "lng": d.get("geometry", {}).get("location", {}).get("lng"),
-            }
-            for d in data
-        ]
+    return [
+        {
+            "name": d.get("name"),
+            "address": d.get("formatted_address"),
+            "place_id": d.get("place_id"),
+            "rating": d.get("rating"),
+            "lat": d.get("geometry", {}).get("location", {}).get("lat"),
+            "lng": d.get("geometry", {}).get("location", {}).get("lng"),
+        }
+        for d in data
+    ]
 
 
 async def google_place_detail(place_id: str) -> Dict[str, Any]:
-    if not GOOGLE_KEY:
+    if not _key():
         return {}
 
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
+    # Lookup order: memory -> persistent store -> Place Details API
+    with span("place_detail", place_id=place_id, cache_hit=True):
+        detail = await cache.get_or_set_async(
+            f"place_detail:{place_id}",
+            lambda: _stored_place_detail(place_id),
+            ttl=get_settings().place_detail_ttl,
+            empty_ttl=get_settings().place_empty_ttl,  # NOT_FOUND: retry soon
+        )
+    return dict(detail)
+
+
+async def _stored_place_detail(place_id: str) -> Dict[str, Any]:
+    """Place details through the persistent place store (fail-soft on store errors)."""
+    set_attributes(cache_hit=False)
+    store = _place_store()
+    if store is not None:
+        try:
+            stored = await store.get_detail(place_id)
+            set_attributes(store_hit=stored is not None)
+            if stored is not None:
+                return stored
+        except Exception:
+            metrics.inc("place_store_errors")
+
+    detail = await _fetch_place_detail(place_id)
+    if store is not None and detail.get("name"):  # Skip empty (NOT_FOUND) details
+        try:
+            await store.put_detail(place_id, detail, get_settings().place_detail_ttl)
+        except Exception:
+            metrics.inc("place_store_errors")
+    return detail
+
+
+async def _fetch_place_detail(place_id: str) -> Dict[str, Any]:
     params = {
         "place_id": place_id,
-        "key": GOOGLE_KEY,
         "fields": "name,geometry,formatted_address,rating,opening_hours,url",
     }
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url, params=params)
-        r.raise_for_status()
-        d = r.json().get("result", {})
+    body = await _maps_get("/maps/api/place/details/json", params)
+    d = body.get("result", {})
 
-        return {
-            "name": d.get("name"),
-            "address": d.get("formatted_address"),
-            "place_id": place_id,
-            "rating": d.get("rating"),
-            "lat": d.get("geometry", {}).get("location", {}).get("lat"),
-            "lng": d.get("geometry", {}).get("location", {}).get("lng"),
-            "url": d.get("url"),
-            "opening_hours": d.get("opening_hours", {}).get("weekday_text"),
-        }
+    return {
+        "name": d.get("name"),
+        "address": d.get("formatted_address"),
+        "place_id": place_id,
+        "rating": d.get("rating"),
+        "lat": d.get("geometry", {}).get("location", {}).get("lat"),
+        "lng": d.get("geometry", {}).get("location", {}).get("lng"),
+        "url": d.get("url"),
+        "opening_hours": d.get("opening_hours", {}).get("weekday_text"),
+    }
 
 
 async def google_route(
     origin: str, destination: str, mode: str = "transit"
 ) -> Dict[str, Any]:
-    if not GOOGLE_KEY:
+    if not _key():
         return {"duration_min": 0, "distance_km": 0.0}
 
-    url = "https://maps.googleapis.com/maps/api/directions/json"
     params = {
         "origin": origin,
         "destination": destination,
         "mode": mode,
-        "key": GOOGLE_KEY,
     }
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url, params=params)
-        r.raise_for_status()
-        routes = r.json().get("routes", [])
+    body = await _maps_get("/maps/api/directions/json", params)
+    routes = body.get("routes", [])
 
-        if not routes:
-            return {"duration_min": 0, "distance_km": 0.0}
+    if not routes:
+        return {"duration_min": 0, "distance_km": 0.0}
 
-        leg = routes[0].get("legs", [{}])[0]
+    leg = routes[0].get("legs", [{}])[0]
 
-        return {
-            "duration_min": int(leg.get("duration", {}).get("value", 0) / 60),
-            "distance_km": round(leg.get("distance", {}).get("value", 0) / 1000, 2),
-        }
+    return {
+        "duration_min": int(leg.get("duration", {}).get("value", 0) / 60),
+        "distance_km": round(leg.get("distance", {}).get("value", 0) / 1000, 2),
+    }
+
+
+# Distance Matrix API limits per request
+MATRIX_MAX_SIDE = 25  # Max origins (and max destinations)
+MATRIX_MAX_ELEMENTS = 100  # Max origins * destinations (each one is billed)
+
+
+async def google_distance_matrix(
+    origins: List[str], destinations: List[str], mode: str = "transit"
+) -> List[List[Optional[Dict[str, Any]]]]:
+    """
+    One Distance Matrix request: origins x destinations of {"duration_min",
+    "distance_km"} (None when unroutable). Callers keep within the API limits above.
+    """
+    if not origins or not destinations:
+        return [[] for _ in origins]
+    if (
+        max(len(origins), len(destinations)) > MATRIX_MAX_SIDE
+        or len(origins) * len(destinations) > MATRIX_MAX_ELEMENTS
+    ):
+        raise ValueError("Distance Matrix request exceeds the API limits")
+    if not _key():
+        return [
+            [{"duration_min": 0, "distance_km": 0.0} for _ in destinations]
+            for _ in origins
+        ]
+
+    params = {
+        "origins": "|".join(origins),
+        "destinations": "|".join(destinations),
+        "mode": mode,
+    }
+    body = await _maps_get("/maps/api/distancematrix/json", params)
+    rows = body.get("rows", [])
+
+    out: List[List[Optional[Dict[str, Any]]]] = []
+    for i in range(len(origins)):
+        elements = rows[i].get("elements", []) if i < len(rows) else []
+        row: List[Optional[Dict[str, Any]]] = []
+        for j in range(len(destinations)):
+            e = elements[j] if j < len(elements) else {}
+            if e.get("status") != "OK":
+                row.append(None)  # ZERO_RESULTS / NOT_FOUND -> caller estimates
+                continue
+            row.append(
+                {
+                    "duration_min": int(e.get("duration", {}).get("value", 0) / 60),
+                    "distance_km": round(
+                        e.get("distance", {}).get("value", 0) / 1000, 2
+                    ),
+                }
+            )
+        out.append(row)
+    return out
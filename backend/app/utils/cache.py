@@ -1,33 +1,197 @@
-# Purpose: Tiny in-memory TTL cache for provider responses (to reduce API costs/latency)
+# Purpose: Bounded in-memory LRU/TTL cache for provider responses (to reduce API costs/latency)
+# - O(1) get/set (OrderedDict in recency order), bounded by entry count and approx bytes.
+# - Active expiry: an expiry heap is swept a little on every write (amortized).
+# - Per-namespace stats (namespace = key prefix before ":"), mirrored into utils.metrics.
+# - Single-flight get_or_set_async: concurrent misses on one key share one upstream call.
+import asyncio  # Single-flight tasks
+import heapq  # Expiry heap
+import json  # Size estimates
+import sys  # Size fallback
+import threading  # Guards state when used from worker threads
 import time  # For expiration timestamps
-from typing import Any, Dict, Tuple  # Typing helpers
+from collections import OrderedDict  # LRU ordering
+from typing import Any, Awaitable, Callable, Dict, List, Tuple  # Typing helpers
+
+from .metrics import metrics  # Hit/miss counters
+from ..settings import get_settings  # Default bounds for the global cache
+
+_MISSING = object()  # Sentinel: distinguishes "not cached" from falsy values
+
+
+def _approx_size(value: Any) -> int:
+    """Rough in-memory footprint of a JSON-like value (bytes of its JSON encoding)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
 
 
 class TTLCache:
     """
-    Simple TTL cache with string keys. Not thread-safe (fine for dev).
-    For production, consider Redis or an in-process LRU with locks.
+    Bounded LRU cache with per-entry TTL and string keys.
+    Evicts least recently used entries beyond `max_entries` / `max_bytes`; expired
+    entries are removed on access and by an amortized sweep on writes.
     """
 
-    def __init__(self, ttl_seconds: int = 900) -> None:
+    def __init__(
+        self,
+        ttl_seconds: int = 900,
+        max_entries: int = 10_000,
+        max_bytes: int = 64_000_000,
+        name: str = "cache",
+        sweep_batch: int = 32,
+    ) -> None:
         self.ttl = ttl_seconds  # Default time-to-live (e.g., 15min)
-        self.store: Dict[str, Tuple[float, Any]] = {}  # Map: key -> (expiry_ts, value)
+        self.max_entries = max_entries  # Entry bound
+        self.max_bytes = max_bytes  # Approximate byte bound
+        self.name = name  # Namespace for keys without a "ns:" prefix
+        self.sweep_batch = sweep_batch  # Expired entries removed per write (at most)
+        self.bytes = 0  # Current approximate size
+        # key -> (expiry_ts, size, value); order = recency (oldest first)
+        self.store: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []  # Min-heap of (expiry_ts, key)
+        self._stats: Dict[str, Dict[str, int]] = {}  # namespace -> counters
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}  # Single-flight tasks
+        self._lock = threading.Lock()
+
+    # --- stats -----------------------------------------------------------------
+
+    def _namespace(self, key: str) -> str:
+        ns, sep, _ = key.partition(":")
+        return ns if sep else self.name
+
+    def _count(self, key: str, event: str) -> None:
+        ns = self._namespace(key)
+        bucket = self._stats.setdefault(ns, {})
+        bucket[event] = bucket.get(event, 0) + 1
+        metrics.inc(f"{ns}_cache_{event}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot: size plus per-namespace hits/misses/sets/evictions/expired."""
+        with self._lock:
+            return {
+                "entries": len(self.store),
+                "bytes": self.bytes,
+                "namespaces": {ns: dict(c) for ns, c in self._stats.items()},
+            }
+
+    # --- core operations -------------------------------------------------------
+
+    def _lookup(self, key: str) -> Any:
+        with self._lock:
+            rec = self.store.get(key)
+            if rec is None:
+                self._count(key, "misses")
+                return _MISSING
+            if time.time() > rec[0]:  # Expired -> delete and miss
+                self._drop(key)
+                self._count(key, "expired")
+                self._count(key, "misses")
+                return _MISSING
+            self.store.move_to_end(key)  # Mark as most recently used
+            self._count(key, "hits")
+            return rec[2]
 
     def get(self, key: str) -> Any | None:
-        now = time.time()  # Current time
-        rec = self.store.get(key)  # Lookup record
-        if not rec:  # Not found -> miss
-            return None
-        exp, value = rec  # Unpack expiry and value
-        if now > exp:  # Expired -> delete and miss
-            del self.store[key]
-            return None
-        return value  # Valid -> hit
+        value = self._lookup(key)
+        return None if value is _MISSING else value
 
     def set(self, key: str, value: Any, ttl: int | None = None) -> None:
         ttl_eff = ttl if ttl is not None else self.ttl  # Use provided TTL or default
-        self.store[key] = (time.time() + ttl_eff, value)  # Save with expiry
+        if ttl_eff <= 0:  # Nothing to keep (e.g. single-flight only)
+            return
+        size = _approx_size(value)
+        with self._lock:
+            if key in self.store:
+                self._drop(key)
+            if size > self.max_bytes:  # Would evict everything else; don't cache
+                return
+            expiry = time.time() + ttl_eff
+            self.store[key] = (expiry, size, value)  # Save with expiry
+            self.bytes += size
+            heapq.heappush(self._expiry, (expiry, key))
+            self._count(key, "sets")
+            self._sweep(self.sweep_batch)
+            while len(self.store) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self.store))  # Least recently used
+                self._drop(oldest)
+                self._count(oldest, "evictions")
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self.store:
+                self._drop(key)
+
+    def sweep(self, limit: int | None = None) -> int:
+        """Remove expired entries (all, or at most `limit`); returns how many."""
+        with self._lock:
+            return self._sweep(limit)
+
+    def _sweep(self, limit: int | None) -> int:
+        now = time.time()
+        removed = 0
+        heap = self._expiry
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            expiry, key = heapq.heappop(heap)
+            rec = self.store.get(key)
+            if rec is not None and rec[0] == expiry:  # Skip stale heap entries
+                self._drop(key)
+                self._count(key, "expired")
+                removed += 1
+        if len(heap) > 2 * len(self.store) + 64:  # Compact overwritten/evicted entries
+            self._expiry = [(rec[0], k) for k, rec in self.store.items()]
+            heapq.heapify(self._expiry)
+        return removed
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self.store.pop(key)
+        self.bytes -= size
+
+    # --- single-flight ---------------------------------------------------------
+
+    async def get_or_set_async(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: int | None = None,
+        empty_ttl: int | None = None,
+    ) -> Any:
+        """
+        Return the cached value, or run `factory` once for all concurrent callers of
+        `key` and cache its result (None results and exceptions are not cached).
+        With `empty_ttl`, empty results ([] / {}) are kept only that long (0 = not
+        cached), so a transient empty answer doesn't hide real data for `ttl`.
+        A caller being cancelled does not cancel the shared upstream call.
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+
+            async def run() -> Any:
+                try:
+                    result = await factory()
+                    if result is not None:
+                        empty = empty_ttl is not None and not result
+                        self.set(key, result, empty_ttl if empty else ttl)
+                    return result
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.ensure_future(run())
+            # Mark failures as retrieved even if every caller was cancelled meanwhile
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        else:
+            self._count(key, "coalesced")
+        return await asyncio.shield(task)
 
 
-# Global cache instance (fine for our use)
-cache = TTLCache(ttl_seconds=900)
+# Global cache instance (bounds from settings)
+cache = TTLCache(
+    ttl_seconds=900,
+    max_entries=get_settings().cache_max_entries,
+    max_bytes=get_settings().cache_max_bytes,
+)
@@ -1,13 +1,93 @@
 # Purpose: Minimal metrics helpers (timing + simple counters) to aid observability
+# - Histograms with fixed latency buckets per stage/upstream label (timer/observe).
+# - Counters (cache hits, retries, fallbacks, errors) and cumulative timings.
+# - render_prometheus() -> Prometheus text exposition, served at GET /metrics.
+# Recording is a bisect + a few integer/float adds: no locks on the hot path (the app
+# records from one event loop; racing threads can at worst lose a sample).
+import re  # Metric name sanitizing
 import time  # Time measurements
+from bisect import bisect_left  # Bucket lookup
+from collections import deque  # Rolling latency windows
 from contextlib import contextmanager  # Context manager helper
-from typing import Dict  # Typing hints
+from typing import Deque, Dict, List, Optional, Tuple  # Typing hints
+
+from .tracing import span  # Every timer is also a span of the request trace
+
+# Upper bounds (seconds) for latency buckets: 5 ms .. 60 s, roughly x2.5 per step
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+_PREFIX = "trip_planner"  # Namespace for exported metric names
+
+
+class LatencyWindow:
+    """Rolling window of recent latency samples (seconds) for percentile lookups."""
+
+    def __init__(self, size: int = 256) -> None:
+        self.samples: Deque[float] = deque(maxlen=size)  # Oldest samples fall off
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 10) -> Optional[float]:
+        """q in [0, 1]; None until enough samples were observed."""
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (non-cumulative counts; +Inf is the last slot)."""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.buckets: List[int] = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when empty)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.bounds, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _metric_name(label: str) -> str:
+    """Prometheus-safe name: [a-zA-Z0-9_] only."""
+    return re.sub(r"[^a-zA-Z0-9_]", "_", label)
+
+
+def _fmt(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
 
 
 class Metrics:
     """
-    Very lightweight metrics store (in-memory).
-    In production, replace with Prometheus/OpenTelemetry exporters.
+    Very lightweight metrics store (in-memory), exported in Prometheus text format.
     """
 
     def __init__(self) -> None:
@@ -15,22 +95,102 @@ class Metrics:
         self.timings: Dict[str, float] = {}
         # Store occurrence counters
         self.counts: Dict[str, int] = {}
+        # Recent latency samples per label (drive adaptive behaviour like LLM hedging)
+        self.windows: Dict[str, LatencyWindow] = {}
+        # Latency distribution per stage/upstream label
+        self.histograms: Dict[str, Histogram] = {}
 
     @contextmanager
     def timer(self, label: str):
         # Record start time
         t0 = time.perf_counter()
         try:
-            yield
+            with span(label):
+                yield
         finally:
-            # Accumulate elapsed time to label
+            # Accumulate elapsed time to label and bucket the sample
             dt = time.perf_counter() - t0
-            self.timings[label] = self.timings.get(label, 0.0) + dt
+            self.add_time(label, dt)
+            self.record(label, dt)
+
+    def add_time(self, label: str, seconds: float) -> None:
+        # Accumulate a duration measured elsewhere (e.g. latency a cache hit saved)
+        self.timings[label] = self.timings.get(label, 0.0) + seconds
+
+    def record(self, label: str, seconds: float) -> None:
+        # Add one latency sample to the label's histogram
+        hist = self.histograms.get(label)
+        if hist is None:
+            hist = self.histograms[label] = Histogram()
+        hist.observe(seconds)
+
+    def observe(self, label: str, seconds: float) -> None:
+        # Record one latency sample in the label's rolling window (and histogram)
+        window = self.windows.get(label)
+        if window is None:
+            window = self.windows[label] = LatencyWindow()
+        window.observe(seconds)
+        self.record(label, seconds)
+
+    def percentile(self, label: str, q: float) -> Optional[float]:
+        # Recent q-percentile latency for label (None without enough samples)
+        window = self.windows.get(label)
+        return window.percentile(q) if window else None
 
     def inc(self, label: str, delta: int = 1):
         # Increment counter by delta
         self.counts[label] = self.counts.get(label, 0) + delta
 
+    def hit_rate(self, prefix: str) -> Optional[float]:
+        # Share of hits among "<prefix>_hits" + "<prefix>_misses" (None before any lookup)
+        hits = self.counts.get(f"{prefix}_hits", 0)
+        total = hits + self.counts.get(f"{prefix}_misses", 0)
+        return hits / total if total else None
+
+    def render_prometheus(self) -> str:
+        """All metrics in Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+
+        hist_name = f"{_PREFIX}_stage_duration_seconds"
+        lines.append(f"# HELP {hist_name} Latency per pipeline stage / upstream call.")
+        lines.append(f"# TYPE {hist_name} histogram")
+        for label, hist in sorted(self.histograms.items()):
+            stage = _metric_name(label)
+            cumulative = 0
+            for bound, n in zip(hist.bounds + (float("inf"),), hist.buckets):
+                cumulative += n
+                lines.append(
+                    f'{hist_name}_bucket{{stage="{stage}",le="{_fmt(bound)}"}} {cumulative}'
+                )
+            lines.append(f'{hist_name}_sum{{stage="{stage}"}} {_fmt(hist.sum)}')
+            lines.append(f'{hist_name}_count{{stage="{stage}"}} {hist.count}')
+
+        for label, value in sorted(self.counts.items()):
+            name = f"{_PREFIX}_{_metric_name(label)}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        # Hit ratio for every "<prefix>_hits" / "<prefix>_misses" pair (e.g. route_cache)
+        ratio_name = f"{_PREFIX}_cache_hit_ratio"
+        lines.append(f"# HELP {ratio_name} Share of lookups served from cache.")
+        lines.append(f"# TYPE {ratio_name} gauge")
+        for label in sorted(self.counts):
+            if not label.endswith("_hits"):
+                continue
+            prefix = label[: -len("_hits")]
+            rate = self.hit_rate(prefix)
+            if rate is not None:
+                lines.append(
+                    f'{ratio_name}{{cache="{_metric_name(prefix)}"}} {_fmt(rate)}'
+                )
+
+        time_name = f"{_PREFIX}_time_seconds_total"
+        lines.append(f"# HELP {time_name} Cumulative seconds per label.")
+        lines.append(f"# TYPE {time_name} counter")
+        for label, value in sorted(self.timings.items()):
+            lines.append(f'{time_name}{{label="{_metric_name(label)}"}} {_fmt(value)}')
+        return "\n".join(lines) + "\n"
+
 
 # Global singleton (simple for this project)
 metrics = Metrics()
@@ -0,0 +1,152 @@
+# Purpose: Persistent place store (SQLite, WAL) behind the in-memory cache
+# - Survives restarts/deploys and is shared by every uvicorn worker on the host
+#   (WAL lets readers run while one worker writes).
+# - Two tables: text-search hits by normalized query, details by place_id, each row with
+#   its own expiry (PLACE_SEARCH_TTL / PLACE_DETAIL_TTL).
+# - sqlite3 is blocking, so calls run in a worker thread via asyncio.to_thread.
+import asyncio  # to_thread
+import json  # Row payloads
+import os  # Parent directory creation
+import sqlite3  # Stdlib, no extra dependency
+import threading  # One connection shared across executor threads
+import time  # Expiry timestamps
+from typing import Any, Dict, List, Optional, Tuple  # Typing helpers
+
+from .metrics import metrics  # Hit/miss counters
+from ..settings import get_settings  # PLACE_STORE_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS place_search (
+    query TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS place_detail (
+    place_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_TABLES = {"search": ("place_search", "query"), "detail": ("place_detail", "place_id")}
+
+
+class PlaceStore:
+    """Key/value store for Places responses with per-row expiry."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # check_same_thread=False: the lock below serializes access from executor threads
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL: concurrent readers + one writer; NORMAL sync is safe with WAL and
+            # skips most fsyncs; busy_timeout waits out other workers' writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # --- sync core (runs in a worker thread) ------------------------------------
+
+    def _get(self, kind: str, key: str) -> Optional[Any]:
+        table, col = _TABLES[kind]
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT payload, expires_at FROM {table} WHERE {col} = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():  # Missing or expired
+            metrics.inc(f"place_store_{kind}_misses")
+            return None
+        metrics.inc(f"place_store_{kind}_hits")
+        return json.loads(row[0])
+
+    def _put(self, kind: str, key: str, value: Any, ttl: int) -> None:
+        table, col = _TABLES[kind]
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({col}, payload, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """Delete expired rows from both tables; returns how many were removed."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for table, _ in _TABLES.values():
+                cur = self._conn.execute(
+                    f"DELETE FROM {table} WHERE expires_at < ?", (now,)
+                )
+                removed += cur.rowcount
+            self._conn.commit()
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- async API ------------------------------------------------------------------
+
+    async def get_search(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        return await asyncio.to_thread(self._get, "search", query)
+
+    async def put_search(
+        self, query: str, results: List[Dict[str, Any]], ttl: int
+    ) -> None:
+        await asyncio.to_thread(self._put, "search", query, results, ttl)
+
+    async def get_detail(self, place_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, "detail", place_id)
+
+    async def put_detail(self, place_id: str, detail: Dict[str, Any], ttl: int) -> None:
+        await asyncio.to_thread(self._put, "detail", place_id, detail, ttl)
+
+
+_store: Optional[PlaceStore] = None  # Process-wide store
+_store_path: Optional[str] = None  # Path `_store` was opened with
+_REOPEN_DELAY_S = 60.0  # After a failed open, wait this long before trying again
+_failed: Optional[Tuple[str, float]] = None  # (path, time) of the last failed open
+
+
+def get_place_store() -> Optional[PlaceStore]:
+    """
+    Shared store for PLACE_STORE_PATH (None when the path is empty = disabled).
+    Raises when the store can't be opened; the open is retried after a delay, not on
+    every lookup.
+    """
+    global _store, _store_path, _failed
+    path = get_settings().place_store_path
+    if not path:
+        return None
+    if _store is None or _store_path != path:  # First use, or path changed on reload
+        if (
+            _failed
+            and _failed[0] == path
+            and time.time() - _failed[1] < _REOPEN_DELAY_S
+        ):
+            raise RuntimeError(f"Place store {path} unavailable (open failed recently)")
+        if _store is not None:
+            _store.close()
+            _store, _store_path = None, None
+        try:
+            _store = PlaceStore(path)
+        except Exception:
+            _failed = (path, time.time())
+            raise
+        _store_path, _failed = path, None
+    return _store
+
+
+def close_place_store() -> None:
+    """Close the shared store (app shutdown)."""
+    global _store, _store_path
+    if _store is not None:
+        _store.close()
+        _store, _store_path = None, None
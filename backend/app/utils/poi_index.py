@@ -0,0 +1,239 @@
+# Purpose: Precomputed verified-POI index for hot cities (SQLite, WAL)
+# - Filled offline by `python -m app.warmup` (LLM candidates -> Places verification per
+#   city and preference category); read by build_itinerary, which then skips the
+#   LLM -> search -> details chain entirely for indexed cities.
+# - One row per verified POI: place_id, name, address, rating, lat/lng, url and
+#   opening hours, ranked within its (city, category).
+# - One row per (city, category) records when it was built and for how many days, so
+#   stale or too-short entries are treated as cold and served live.
+import asyncio  # to_thread
+import json  # Opening hours column
+import os  # Parent directory creation
+import sqlite3  # Stdlib, no extra dependency
+import threading  # One connection shared across executor threads
+import time  # Build timestamps
+import unicodedata  # City key normalization
+from typing import Any, Dict, List, Optional, Sequence, Tuple  # Typing helpers
+
+from ..settings import get_settings  # POI_INDEX_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS poi_city (
+    city_key TEXT NOT NULL,
+    category TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    built_at REAL NOT NULL,
+    PRIMARY KEY (city_key, category)
+);
+CREATE TABLE IF NOT EXISTS poi (
+    city_key TEXT NOT NULL,
+    category TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    place_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    address TEXT,
+    rating REAL,
+    lat REAL,
+    lng REAL,
+    url TEXT,
+    opening_hours TEXT,
+    PRIMARY KEY (city_key, category, place_id)
+);
+"""
+
+_COLUMNS = "place_id, name, address, rating, lat, lng, url, opening_hours"
+
+
+def index_key(city: str, country: Optional[str] = None) -> str:
+    """Normalized "city|country" ("  Hà Nội ", None -> "hà nội|")."""
+    parts = [city or "", country or ""]
+    return "|".join(
+        " ".join(unicodedata.normalize("NFKC", p).casefold().split()) for p in parts
+    )
+
+
+def index_categories(preferences: Optional[Sequence[Any]]) -> List[str]:
+    """Index categories for a request's preferences ("" = no preference / general)."""
+    cats = {" ".join(str(p).casefold().split()) for p in (preferences or [])}
+    return sorted(c for c in cats if c) or [""]
+
+
+def _row_to_poi(row: Sequence[Any]) -> Dict[str, Any]:
+    """Same shape as google_place_detail returns."""
+    return {
+        "name": row[1],
+        "address": row[2],
+        "place_id": row[0],
+        "rating": row[3],
+        "lat": row[4],
+        "lng": row[5],
+        "url": row[6],
+        "opening_hours": json.loads(row[7]) if row[7] else None,
+    }
+
+
+class PoiIndex:
+    """Verified POIs per (city, category), in rank order."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # check_same_thread=False: the lock below serializes access from executor threads
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL: workers keep reading while the warm-up job rewrites a city
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # --- sync core (runs in a worker thread) ------------------------------------
+
+    def replace(
+        self, key: str, category: str, pois: List[Dict[str, Any]], days: int
+    ) -> None:
+        """Swap in the verified POIs for one city/category (order = rank)."""
+        rows = []
+        seen = set()
+        for poi in pois:
+            if not poi.get("place_id") or not poi.get("name"):
+                continue
+            if poi["place_id"] in seen:  # Two candidates resolved to one place
+                continue
+            seen.add(poi["place_id"])
+            hours = poi.get("opening_hours")
+            rows.append(
+                (
+                    key,
+                    category,
+                    len(rows),
+                    poi["place_id"],
+                    poi["name"],
+                    poi.get("address"),
+                    poi.get("rating"),
+                    poi.get("lat"),
+                    poi.get("lng"),
+                    poi.get("url"),
+                    json.dumps(hours) if hours else None,
+                )
+            )
+        with self._lock:
+            with self._conn:  # One transaction: readers see old or new, never half
+                self._conn.execute(
+                    "DELETE FROM poi WHERE city_key = ? AND category = ?",
+                    (key, category),
+                )
+                self._conn.executemany(
+                    f"INSERT INTO poi (city_key, category, rank, {_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO poi_city (city_key, category, days, "
+                    "built_at) VALUES (?, ?, ?, ?)",
+                    (key, category, days, time.time()),
+                )
+
+    def _lookup(
+        self, key: str, categories: List[str], days: int, max_age_s: float
+    ) -> Optional[List[List[Dict[str, Any]]]]:
+        """POIs per category (rank order); None if any category is missing or stale."""
+        out: List[List[Dict[str, Any]]] = []
+        with self._lock:
+            for category in categories:
+                meta = self._conn.execute(
+                    "SELECT days, built_at FROM poi_city "
+                    "WHERE city_key = ? AND category = ?",
+                    (key, category),
+                ).fetchone()
+                if (
+                    meta is None or meta[0] < days
+                ):  # Not built / built for shorter trips
+                    return None
+                if max_age_s > 0 and time.time() - meta[1] > max_age_s:
+                    return None
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM poi WHERE city_key = ? AND category = ? "
+                    "ORDER BY rank",
+                    (key, category),
+                ).fetchall()
+                out.append([_row_to_poi(r) for r in rows])
+        return out
+
+    def cities(self) -> List[Dict[str, Any]]:
+        """Indexed (city, category) entries with POI counts and build times."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.city_key, c.category, c.days, c.built_at, COUNT(p.place_id) "
+                "FROM poi_city c LEFT JOIN poi p "
+                "ON p.city_key = c.city_key AND p.category = c.category "
+                "GROUP BY c.city_key, c.category ORDER BY c.city_key, c.category"
+            ).fetchall()
+        return [
+            {
+                "city": r[0],
+                "category": r[1],
+                "days": r[2],
+                "built_at": r[3],
+                "pois": r[4],
+            }
+            for r in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- async API ------------------------------------------------------------------
+
+    async def lookup(
+        self, key: str, categories: List[str], days: int, max_age_s: float
+    ) -> Optional[List[List[Dict[str, Any]]]]:
+        return await asyncio.to_thread(self._lookup, key, categories, days, max_age_s)
+
+
+_index: Optional[PoiIndex] = None  # Process-wide index
+_index_path: Optional[str] = None  # Path `_index` was opened with
+_REOPEN_DELAY_S = 60.0  # After a failed open, wait this long before trying again
+_failed: Optional[Tuple[str, float]] = None  # (path, time) of the last failed open
+
+
+def get_poi_index() -> Optional[PoiIndex]:
+    """
+    Shared index for POI_INDEX_PATH (None when the path is empty = disabled).
+    Raises when the index can't be opened; the open is retried after a delay, not on
+    every request.
+    """
+    global _index, _index_path, _failed
+    s = get_settings()
+    path = s.poi_index_path
+    if not path:
+        return None
+    if _index is None or _index_path != path:  # First use, or path changed on reload
+        if (
+            _failed
+            and _failed[0] == path
+            and time.time() - _failed[1] < _REOPEN_DELAY_S
+        ):
+            raise RuntimeError(f"POI index {path} unavailable (open failed recently)")
+        if _index is not None:
+            _index.close()
+            _index, _index_path = None, None
+        try:
+            _index = PoiIndex(path)
+        except Exception:
+            _failed = (path, time.time())
+            raise
+        _index_path, _failed = path, None
+    return _index
+
+
+def close_poi_index() -> None:
+    """Close the shared index (app shutdown)."""
+    global _index, _index_path
+    if _index is not None:
+        _index.close()
+        _index, _index_path = None, None
@@ -0,0 +1,201 @@
+# Purpose: Per-upstream rate limiting + adaptive concurrency (Maps, hotels, each LLM provider)
+# - TokenBucket: steady QPS with a small burst, so fan-out doesn't exceed provider quotas.
+# - AIMDLimiter: concurrency limit that grows by ~1 per window of successes and halves on
+#   429 / OVER_QUERY_LIMIT (TCP-style), so throughput settles at what the quota allows.
+# - call_with_backoff: run one upstream call under both, retrying rate-limited answers
+#   with exponential backoff + jitter instead of dropping them.
+import asyncio  # Waiters + backoff sleeps
+import random  # Backoff jitter
+import time  # Token refill clock
+from collections import deque  # FIFO waiters
+from contextlib import asynccontextmanager  # Slot context manager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple  # Typing
+
+from .metrics import metrics  # Throttle/retry counters
+from ..settings import Settings, get_settings  # Limits per upstream
+
+
+class RateLimited(Exception):
+    """Upstream said "slow down" (HTTP 429, OVER_QUERY_LIMIT, provider rate-limit error)."""
+
+    def __init__(self, upstream: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"{upstream} rate limited")
+        self.retry_after = retry_after  # Seconds, when the upstream told us
+
+
+class TokenBucket:
+    """Async token bucket; `rate` tokens/s, up to `burst` saved. rate <= 0 = unlimited."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Reserve a token now (may go negative) and sleep until it is ours; no lock
+        # needed because the reservation itself happens without awaiting
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase / multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        decrease: float = 0.5,
+        cooldown_s: float = 1.0,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease = decrease
+        self.cooldown_s = cooldown_s  # One decrease per burst of overload signals
+        self.inflight = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    async def acquire(self) -> None:
+        while self.inflight >= int(self.limit):
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+                self._wake()  # Pass on a wake-up we may have consumed
+                raise
+        self.inflight += 1
+
+    def release(self) -> None:
+        self.inflight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        # +1 per `limit` successes, i.e. roughly +1 per round of in-flight calls
+        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_overload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown_s:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self._last_decrease = now
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.inflight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+
+class Upstream:
+    """Token bucket + AIMD limiter for one upstream API."""
+
+    def __init__(self, name: str, qps: float, burst: int, max_concurrency: int) -> None:
+        self.name = name
+        self.bucket = TokenBucket(qps, burst)
+        self.aimd = AIMDLimiter(
+            initial=max(1, max_concurrency // 2), max_limit=max_concurrency
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.aimd.acquire()  # Concurrency first, so the token isn't spent waiting
+        try:
+            await self.bucket.acquire()
+            yield
+        finally:
+            self.aimd.release()
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    return isinstance(exc, RateLimited)
+
+
+async def call_with_backoff(
+    upstream: Upstream,
+    fn: Callable[[], Awaitable[Any]],
+    retries: int,
+    base_delay: float,
+    is_rate_limited: Callable[[BaseException], bool] = _is_rate_limited,
+) -> Any:
+    """
+    Run `fn` within the upstream's limits. Rate-limited attempts shrink the concurrency
+    limit and are retried after exponential backoff (with jitter, honouring Retry-After);
+    the last one re-raises. Other exceptions propagate immediately.
+    """
+    for attempt in range(retries + 1):
+        async with upstream.slot():
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                upstream.aimd.on_overload()
+                metrics.inc(f"{upstream.name}_rate_limited")
+                if attempt == retries:
+                    raise
+                retry_after = getattr(e, "retry_after", None)
+            else:
+                upstream.aimd.on_success()
+                return result
+        delay = base_delay * 2**attempt * random.uniform(0.5, 1.5)
+        if retry_after:
+            delay = max(delay, retry_after)
+        metrics.inc(f"{upstream.name}_retries")
+        await asyncio.sleep(min(delay, 30.0))
+
+
+def _limits(s: Settings, name: str) -> Tuple[float, int, int]:
+    """(qps, burst, max_concurrency) for an upstream name ("maps", "hotels", "llm_*")."""
+    if name == "maps":
+        return s.maps_qps, s.maps_burst, s.maps_max_concurrency
+    if name == "hotels":
+        return s.hotels_qps, s.hotels_burst, s.hotels_max_concurrency
+    return s.llm_qps, s.llm_burst, s.llm_max_concurrency  # Per LLM provider
+
+
+# name -> (limits it was built with, instance); rebuilt when settings change
+_upstreams: Dict[str, Tuple[Tuple[float, int, int], Upstream]] = {}
+
+
+def get_upstream(name: str, settings: Optional[Settings] = None) -> Upstream:
+    """Process-wide limiter for `name` (limits from RATE_LIMIT_* / *_QPS settings)."""
+    s = settings or get_settings()
+    limits = _limits(s, name)
+    entry = _upstreams.get(name)
+    if entry is None or entry[0] != limits:
+        entry = _upstreams[name] = (limits, Upstream(name, *limits))
+    return entry[1]
+
+
+async def limited(
+    name: str,
+    fn: Callable[[], Awaitable[Any]],
+    is_rate_limited: Callable[[BaseException], bool] = _is_rate_limited,
+) -> Any:
+    """call_with_backoff on the named upstream, or a plain call when limiting is off."""
+    s = get_settings()
+    if not s.rate_limit_enabled:
+        return await fn()
+    return await call_with_backoff(
+        get_upstream(name, s),
+        fn,
+        retries=s.upstream_retries,
+        base_delay=s.upstream_backoff_s,
+        is_rate_limited=is_rate_limited,
+    )
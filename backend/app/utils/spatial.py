@@ -0,0 +1,169 @@
+# Purpose: In-process spatial index over places (uniform lat/lng grid on NumPy arrays)
+# - Radius queries and k-nearest lookups: the grid narrows the search to nearby cells,
+#   then exact haversine distances are computed for those points in one vector op.
+# - PlaceDeduper / dedupe_places merge near-duplicates (same place_id, or a few metres
+#   apart with similar names, e.g. one market listed under two names).
+# - Cheap to build per request (n is tens to hundreds), so no persistence.
+import math  # Cell maths
+from typing import Any, Dict, List, Optional, Tuple  # Typing helpers
+
+import numpy as np  # Coordinate arrays
+
+from .geo import haversine_km_to  # Vectorized point -> many distances
+from .text import name_similarity  # Fuzzy name match for merges
+
+_KM_PER_DEG_LAT = 111.32  # Length of one degree of latitude
+
+
+def _has_coords(p: Dict[str, Any]) -> bool:
+    return isinstance(p.get("lat"), (int, float)) and isinstance(
+        p.get("lng"), (int, float)
+    )
+
+
+class SpatialIndex:
+    """Grid of ~`cell_km` square cells over places with lat/lng (others are ignored)."""
+
+    def __init__(
+        self, places: Optional[List[Dict[str, Any]]] = None, cell_km: float = 0.5
+    ) -> None:
+        self.cell_deg = cell_km / _KM_PER_DEG_LAT
+        self.items: List[Dict[str, Any]] = []
+        self._lats: List[float] = []
+        self._lngs: List[float] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}  # cell -> item indexes
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None  # Built lazily
+        for p in places or []:
+            self.add(p)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        # Longitude cells widen with latitude; the query box compensates (see _candidates)
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def add(self, place: Dict[str, Any]) -> bool:
+        """Index a place; False (not indexed) when it has no coordinates."""
+        if not _has_coords(place):
+            return False
+        idx = len(self.items)
+        self.items.append(place)
+        self._lats.append(float(place["lat"]))
+        self._lngs.append(float(place["lng"]))
+        self._cells.setdefault(self._cell(place["lat"], place["lng"]), []).append(idx)
+        self._arrays = None
+        return True
+
+    def _coords(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = (np.array(self._lats), np.array(self._lngs))
+        return self._arrays
+
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """Indexes of items in every cell the radius' bounding box touches."""
+        dlat = radius_km / _KM_PER_DEG_LAT
+        dlng = dlat / max(0.01, math.cos(math.radians(lat)))
+        lat0, lng0 = self._cell(lat - dlat, lng - dlng)
+        lat1, lng1 = self._cell(lat + dlat, lng + dlng)
+        if (lat1 - lat0 + 1) * (lng1 - lng0 + 1) > len(self._cells):
+            return np.arange(len(self.items))  # Box covers more cells than exist
+        found: List[int] = []
+        for i in range(lat0, lat1 + 1):
+            for j in range(lng0, lng1 + 1):
+                found.extend(self._cells.get((i, j), ()))
+        return np.array(found, dtype=int)
+
+    def within(
+        self, lat: float, lng: float, radius_km: float
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """(distance_km, place) for every place within `radius_km`, nearest first."""
+        if not self.items:
+            return []
+        idx = self._candidates(lat, lng, radius_km)
+        if not len(idx):
+            return []
+        lats, lngs = self._coords()
+        dist = haversine_km_to(lat, lng, lats[idx], lngs[idx])
+        keep = np.flatnonzero(dist <= radius_km)
+        keep = keep[np.argsort(dist[keep], kind="stable")]
+        return [(float(dist[k]), self.items[idx[k]]) for k in keep]
+
+    def nearest(
+        self, lat: float, lng: float, k: int = 1
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """The `k` nearest places as (distance_km, place), nearest first."""
+        if not self.items or k <= 0:
+            return []
+        # Grow the search radius until it holds k places (radius results are exact,
+        # so the k closest inside it are the k closest overall)
+        radius = self.cell_deg * _KM_PER_DEG_LAT
+        while True:
+            hits = self.within(lat, lng, radius)
+            if len(hits) >= k or len(hits) == len(self.items):
+                return hits[:k]
+            if radius > 2 * math.pi * 6371.0:  # Whole globe searched
+                return hits[:k]
+            radius *= 2
+
+    def centre(self) -> Optional[Tuple[float, float]]:
+        """Median lat/lng (robust to a few far-off outliers); None when empty."""
+        if not self.items:
+            return None
+        lats, lngs = self._coords()
+        return float(np.median(lats)), float(np.median(lngs))
+
+
+def _merge(kept: Dict[str, Any], dup: Dict[str, Any]) -> None:
+    """Fill fields the kept place lacks from its duplicate."""
+    for field, value in dup.items():
+        if kept.get(field) in (None, "", []) and value not in (None, "", []):
+            kept[field] = value
+
+
+class PlaceDeduper:
+    """
+    Incremental near-duplicate filter: add() keeps a place unless it has the place_id
+    of a kept place, or lies within `radius_m` of one with name_similarity >=
+    `min_similarity`; a duplicate's missing fields are merged into the kept place.
+    """
+
+    def __init__(self, radius_m: float = 75.0, min_similarity: float = 0.6) -> None:
+        self.radius_m = radius_m
+        self.min_similarity = min_similarity
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._index = SpatialIndex(cell_km=max(radius_m, 1.0) / 1000)
+
+    def _match(self, place: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        pid = place.get("place_id")
+        match = self._by_id.get(pid) if pid else None
+        if match is None and _has_coords(place) and self.radius_m > 0:
+            near = self._index.within(place["lat"], place["lng"], self.radius_m / 1000)
+            for _, kept in near:
+                if (
+                    name_similarity(place.get("name") or "", kept.get("name") or "")
+                    >= self.min_similarity
+                ):
+                    return kept
+        return match
+
+    def add(self, place: Dict[str, Any]) -> bool:
+        """True when `place` is kept; False when merged into an earlier place."""
+        match = self._match(place)
+        if match is not None:
+            _merge(match, place)
+            return False
+        self._index.add(place)
+        if place.get("place_id"):
+            self._by_id[place["place_id"]] = place
+        return True
+
+
+def dedupe_places(
+    places: List[Dict[str, Any]],
+    radius_m: float = 75.0,
+    min_similarity: float = 0.6,
+) -> List[Dict[str, Any]]:
+    """Drop near-duplicates (see PlaceDeduper), keeping first occurrences in order."""
+    seen = PlaceDeduper(radius_m, min_similarity)
+    return [place for place in places if seen.add(place)]
@@ -0,0 +1,200 @@
+# Purpose: Place-name normalization and fuzzy matching (candidate + POI dedup)
+# - fold(): Unicode folding (accents, width, case) + punctuation -> spaces.
+# - Articles ("the", "le", "l'", "del", ...) are dropped. Type words ("museum", "musée",
+#   "piazza") say what a place is, not which one: they are ignored when only one name
+#   has them or both mean the same kind of place, so "Louvre", "The Louvre", "Musée du
+#   Louvre" and "Louvre Museum" are one candidate, while different kinds keep names
+#   apart ("Palazzo Vecchio" vs "Ponte Vecchio", "Piazza" vs "Basilica di San Marco").
+# - token_set_ratio(): order-insensitive similarity for typos / extra words.
+import difflib  # Character similarity
+import unicodedata  # Accent folding
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)  # Typing helpers
+
+# Articles / connectives in the languages LLMs most often mix into POI names
+_ARTICLES = frozenset("""
+    a an the of and at in on
+    l le la les un une de du des d au aux et
+    el los las lo del al y
+    il lo gli i da di dei della delle
+    der die das den dem des von und zu zum zur
+    o os as do dos da das
+    """.split())
+
+# Words that say what a place is, not which one; one line per kind of place
+_PLACE_KINDS = """
+    cafe
+    restaurant
+    bar
+    museum musee museo museu
+    market marche mercado mercato markt
+    park parc parque parco
+    church eglise iglesia chiesa kirche
+    cathedral cathedrale catedral duomo
+    basilica basilique
+    square place plaza piazza platz
+    street rue calle via strasse
+    avenue
+    boulevard
+    garden gardens jardin jardins giardino
+    tower tour torre
+    palace palais palacio palazzo
+    castle chateau castillo castello
+    bridge pont puente ponte
+    fountain fontaine fontana brunnen
+    station
+    gallery galerie galleria
+    temple
+    beach plage playa spiaggia
+    opera
+    theatre theater
+    centre center
+    district quarter neighborhood neighbourhood
+    """
+# Type word -> its kind (the first word of its line)
+_KIND: Dict[str, str] = {
+    word: line.split()[0] for line in _PLACE_KINDS.splitlines() for word in line.split()
+}
+
+# Letters NFKD leaves whole ("Sacré-Cœur" -> "sacre-coeur")
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "ø": "o", "ł": "l", "đ": "d"})
+
+
+def fold(text: str) -> str:
+    """Accent-free, casefolded, no punctuation ("Musée d'Orsay" -> "musee d orsay")."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    lowered = stripped.casefold().translate(_LIGATURES)
+    return " ".join("".join(c if c.isalnum() else " " for c in lowered).split())
+
+
+def name_tokens(name: str, ignore: Iterable[str] = ()) -> List[str]:
+    """Folded tokens without articles (and without `ignore`, e.g. the city's tokens)."""
+    skip = _ARTICLES | set(ignore)
+    return [t for t in fold(name).split() if t not in skip]
+
+
+def place_kinds(tokens: Iterable[str]) -> FrozenSet[str]:
+    """Kinds of place the type words name ("Musée du Louvre" -> {"museum"})."""
+    return frozenset(_KIND[t] for t in tokens if t in _KIND)
+
+
+def same_kind(a: Iterable[str], b: Iterable[str]) -> bool:
+    """False when both token lists name a kind of place and the kinds differ."""
+    ka, kb = place_kinds(a), place_kinds(b)
+    return not ka or not kb or ka == kb
+
+
+def distinctive_tokens(tokens: Iterable[str], keep_types: bool = False) -> Set[str]:
+    """The tokens that identify a place: no 1-2 letter fragments, no type words
+    (unless `keep_types`, for names of different kinds)."""
+    return {
+        t
+        for t in tokens
+        if (len(t) > 2 or t.isdigit()) and (keep_types or t not in _KIND)  # "Pier 39"
+    }
+
+
+def _identity(a: List[str], b: List[str]) -> Tuple[Set[str], Set[str]]:
+    """Distinctive words of two names; type words count only when the kinds differ."""
+    keep = not same_kind(a, b)
+    return distinctive_tokens(a, keep), distinctive_tokens(b, keep)
+
+
+def token_set_ratio(a: List[str], b: List[str]) -> float:
+    """
+    0..1 similarity of two token lists, independent of order and repeats: the shared
+    tokens followed by each side's remainder are compared as strings. Unlike the
+    classic variant a strict subset does not score 1.0 ("central park" vs "central park
+    zoo" = 0.85), so extra distinctive words still count.
+    """
+    sa, sb = set(a), set(b)
+    if not sa or not sb:
+        return 0.0
+    common = sorted(sa & sb)
+    left = " ".join(common + sorted(sa - sb))
+    right = " ".join(common + sorted(sb - sa))
+    return difflib.SequenceMatcher(None, left, right).ratio()
+
+
+def name_similarity(a: str, b: str, ignore: Iterable[str] = ()) -> float:
+    """
+    0..1: 1.0 when the distinctive words are identical ("Musée du Louvre" / "The
+    Louvre"), 0.0 for different kinds of place ("Piazza" / "Basilica di San Marco"),
+    else the better of token_set_ratio and the share of the shorter name's distinctive
+    words found in the other ("Marché d'Aligre" / "Aligre Market").
+    """
+    ta, tb = name_tokens(a, ignore), name_tokens(b, ignore)
+    if not same_kind(ta, tb):
+        return 0.0
+    da, db = distinctive_tokens(ta), distinctive_tokens(tb)
+    if da and da == db:
+        return 1.0
+    overlap = len(da & db) / min(len(da), len(db)) if da and db else 0.0
+    return max(token_set_ratio(ta, tb), overlap)
+
+
+class FuzzyDeduper:
+    """
+    Streaming duplicate filter for candidate names: add() is True for a new name,
+    False when it matches one already seen: same folded text, same distinctive words
+    (type words aside, unless the kinds of place differ), or a spelling variant: each
+    side has words the other lacks and those words are >= `threshold` alike
+    ("Colosseum" / "Coliseum" = 0.82, "Gion" / "Ginza" = 0.67). Above 1 only the
+    first applies.
+    """
+
+    def __init__(self, threshold: float = 0.8, ignore: Iterable[str] = ()) -> None:
+        self.threshold = threshold
+        self.ignore = set(ignore)
+        self._folded: Set[str] = set()  # Folded text of accepted names
+        self._seen: List[List[str]] = []  # Their token lists
+        # Distinctive words (type words dropped) -> kinds of the names that had them
+        self._keys: Dict[FrozenSet[str], List[FrozenSet[str]]] = {}
+
+    def add(self, name: str) -> bool:
+        folded = fold(name)
+        if not folded or folded in self._folded:
+            return False  # Empty / punctuation only, or an exact repeat
+        self._folded.add(folded)
+        if self.threshold > 1:
+            return True
+        tokens = name_tokens(name, self.ignore) or folded.split()
+        key = frozenset(distinctive_tokens(tokens))
+        kinds = place_kinds(tokens)
+        if key and any(
+            not k or not kinds or k == kinds for k in self._keys.get(key, ())
+        ):
+            return False  # Same words, same (or unstated) kind of place
+        if any(self._similar(tokens, seen) for seen in self._seen):
+            return False
+        self._seen.append(tokens)
+        if key:
+            self._keys.setdefault(key, []).append(kinds)
+        return True
+
+    def _similar(self, a: List[str], b: List[str]) -> bool:
+        """Spelling variants only: the words each side lacks are near-identical."""
+        if not same_kind(a, b):
+            return False  # "Palazzo Vecchio" vs "Ponte Vecchio"
+        da, db = _identity(a, b)
+        if not (da - db) or not (db - da):
+            return False  # One name adds words ("Central Park" vs "... Zoo")
+        if any(c.isdigit() for t in da ^ db for c in t):
+            return False  # Numbers identify places ("Pier 39" vs "Pier 17")
+        # Compare only the differing words: shared ones ("Saint", "Santa Maria")
+        # would make unrelated names look alike
+        left, right = " ".join(sorted(da - db)), " ".join(sorted(db - da))
+        return difflib.SequenceMatcher(None, left, right).ratio() >= self.threshold
+
+
+def city_tokens(city: Optional[str]) -> List[str]:
+    """City words, ignored when comparing candidates ("Louvre Paris" ~ "Louvre")."""
+    return [t for t in fold(city or "").split() if t.isalpha()]  # Keep "Pier 39"
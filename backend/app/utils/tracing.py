@@ -0,0 +1,114 @@
+# Purpose: Request-scoped tracing via contextvars (span tree per HTTP request)
+# - start_trace() opens a root span for the request; span() opens a child of the current
+#   span. asyncio tasks inherit the context, so concurrent work nests correctly.
+# - Outside a trace, span() is a no-op (one ContextVar lookup), so library code can
+#   always call it.
+# - Finished traces render as a JSON-able tree (slow-request log) or a compact
+#   per-stage summary (X-Debug-Timing header).
+import asyncio  # CancelledError status
+import time  # Span timestamps
+from contextlib import contextmanager  # Span context manager
+from contextvars import ContextVar  # Request-scoped current span
+from typing import Any, Dict, Iterator, List, Optional  # Typing helpers
+
+
+class Span:
+    """One timed operation: name, start/end, status, attributes, child spans."""
+
+    __slots__ = ("name", "start", "end", "status", "attrs", "children")
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = "ok"
+        self.attrs: Dict[str, Any] = attrs or {}
+        self.children: List["Span"] = []
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """Tree as plain dicts; times in ms relative to `origin` (the root's start)."""
+        out: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 1),
+            "dur_ms": round(self.duration_ms, 1),
+            "status": self.status,
+        }
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.children:
+            out["children"] = [c.to_dict(origin) for c in self.children]
+        return out
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Span]:
+    """Open a root span and make it current for the enclosed (request) work."""
+    root = Span(name, attrs)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.status = "error"
+        root.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        root.end = time.perf_counter()
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current one; yields None (and records nothing) outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.status = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+        child.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        child.end = time.perf_counter()
+        try:
+            _current.reset(token)
+        except ValueError:  # Closed from another context (e.g. async generator aclose)
+            _current.set(parent)
+
+
+def set_attributes(**attrs: Any) -> None:
+    """Annotate the current span (no-op outside a trace)."""
+    s = _current.get()
+    if s is not None:
+        s.attrs.update(attrs)
+
+
+def stage_summary(root: Span) -> str:
+    """
+    Compact per-stage breakdown: total ms (and count when > 1) per span name, e.g.
+    "total=912.4, llm_candidates=480.1, maps_textsearch=640.2/8".
+    """
+    totals: Dict[str, List[float]] = {}
+    stack = list(root.children)
+    while stack:
+        s = stack.pop()
+        agg = totals.setdefault(s.name, [0.0, 0])
+        agg[0] += s.duration_ms
+        agg[1] += 1
+        stack.extend(s.children)
+    parts = [f"total={root.duration_ms:.1f}"]
+    for name, (ms, n) in sorted(totals.items(), key=lambda kv: -kv[1][0]):
+        parts.append(f"{name}={ms:.1f}" + (f"/{n}" if n > 1 else ""))
+    return ", ".join(parts)
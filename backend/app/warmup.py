@@ -0,0 +1,150 @@
+# Purpose: Offline warm-up of the precomputed POI index (`python -m app.warmup`)
+# - For every city x preference category: LLM candidates -> Places verification, the
+#   same chain build_itinerary runs live, stored in POI_INDEX_PATH.
+# - Run it nightly (or after changing MIN_RATING) for the top cities; build_itinerary then
+#   serves those cities from the index and only plans cold cities live.
+#
+# CLI: python -m app.warmup cities.txt [--categories ",food,culture"] [--days 7]
+#      [--concurrency 4] [--list]
+#      (cities.txt: one city per line, optionally "City | Country"; "-" reads stdin)
+import argparse  # CLI flags
+import asyncio  # Concurrency budget
+import sys  # stdin/stderr
+import time  # Progress timing
+from typing import List, Optional, Tuple  # Typing helpers
+
+from .agents.planner_llm import day_bucket, llm_poi_candidates  # LLM candidates
+from .agents.verifier import verify_pois  # Places verification
+from .llm.provider import registry  # LLM clients (closed at exit)
+from .settings import Settings, reload_settings  # POI_INDEX_PATH, MIN_RATING
+from .tools.http import start_http_client, close_http_client  # Shared pooled client
+from .utils.place_store import close_place_store  # Persistent place store
+from .utils.poi_index import (  # Index storage
+    PoiIndex,
+    close_poi_index,
+    get_poi_index,
+    index_categories,
+    index_key,
+)
+
+# General list (no preference) plus the most requested preference categories
+DEFAULT_CATEGORIES = ",food,culture,nature,nightlife,shopping"
+
+
+def _read_cities(path: str) -> List[Tuple[str, Optional[str]]]:
+    """(city, country) pairs; blank lines and "#" comments are skipped."""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    cities = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        city, _, country = (part.strip() for part in line.partition("|"))
+        cities.append((city, country or None))
+    return cities
+
+
+async def warm_city(
+    index: PoiIndex,
+    city: str,
+    country: Optional[str],
+    category: str,
+    days: int,
+    s: Settings,
+) -> int:
+    """Rebuild one (city, category) entry; returns how many POIs were stored."""
+    req = {
+        "city": city,
+        "country": country,
+        "days": days,
+        "preferences": [category] if category else [],
+    }
+    names = await llm_poi_candidates(req, s)
+    verified = await verify_pois(names, city, s, country=country)
+    if not verified:  # Keep the previous entry rather than indexing nothing
+        return 0
+    # The entry covers trips up to `days` long (see the lookup in build_itinerary)
+    await asyncio.to_thread(
+        index.replace, index_key(city, country), category, verified, days
+    )
+    return len(verified)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    s = reload_settings()
+    index = get_poi_index()
+    if index is None:
+        print("POI_INDEX_PATH is empty; nothing to warm", file=sys.stderr)
+        return 2
+    if args.list:
+        for row in index.cities():
+            age_h = (time.time() - row["built_at"]) / 3600
+            print(
+                f"{row['city']:<32} {row['category'] or '-':<14} "
+                f"{row['pois']:>4} POIs  {row['days']:>2}d  {age_h:6.1f}h old"
+            )
+        close_poi_index()
+        return 0
+
+    cities = _read_cities(args.input)
+    categories = sorted({index_categories([c])[0] for c in args.categories.split(",")})
+    days = day_bucket(args.days)  # Candidate lists are produced per day bucket
+    await start_http_client(s)
+    slots = asyncio.Semaphore(max(1, args.concurrency))
+    failed = 0
+
+    async def warm(city: str, country: Optional[str], category: str) -> None:
+        nonlocal failed
+        async with slots:
+            t0 = time.perf_counter()
+            try:
+                count = await warm_city(index, city, country, category, days, s)
+            except Exception as e:  # One bad city must not stop the job
+                failed += 1
+                print(f"{city} [{category or '-'}]: {e}", file=sys.stderr)
+                return
+            status = f"{count} POIs" if count else "no POIs, kept previous entry"
+            print(
+                f"{city} [{category or '-'}]: {status} "
+                f"({time.perf_counter() - t0:.1f}s)",
+                file=sys.stderr,
+            )
+            failed += count == 0
+
+    try:
+        await asyncio.gather(
+            *(warm(c, k, cat) for c, k in cities for cat in categories)
+        )
+    finally:
+        await registry.aclose()
+        await close_http_client()
+        close_place_store()
+        close_poi_index()
+    print(
+        f"warmed {len(cities)} cities x {len(categories)} categories, "
+        f"{failed} failed",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Precompute verified POIs for hot cities.")
+    ap.add_argument(
+        "input", nargs="?", default="-", help="cities, one per line ('-' = stdin)"
+    )
+    ap.add_argument(
+        "--categories",
+        default=DEFAULT_CATEGORIES,
+        help="comma-separated preference categories (empty item = no preference)",
+    )
+    ap.add_argument(
+        "--days", type=int, default=7, help="longest trip served from the index"
+    )
+    ap.add_argument("--concurrency", type=int, default=4, help="entries built at once")
+    ap.add_argument("--list", action="store_true", help="show the index and exit")
+    sys.exit(asyncio.run(_main(ap.parse_args())))
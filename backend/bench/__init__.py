@@ -0,0 +1 @@
+# Purpose: Local benchmarks (fake upstream servers + drivers); run with `python -m bench.<name>`
@@ -0,0 +1,63 @@
+# Purpose: Time geographic day planning and compare travel distance vs round-robin
+# Usage: python -m bench.bench_geoplan [--pois 200] [--days 7]
+import argparse  # CLI flags
+import random  # Synthetic POIs
+import statistics  # Median timing
+import time  # perf_counter
+
+from app.agents.geoplan import path_length_km, plan_days
+from app.orchestrator import _distribute_across_days
+
+
+def _synthetic_pois(n: int, seed: int) -> list[dict]:
+    """Clustered POIs around a few neighbourhoods of a ~15 km city (like real LLM output)."""
+    rnd = random.Random(seed)
+    hubs = [
+        (48.8566 + rnd.uniform(-0.06, 0.06), 2.3522 + rnd.uniform(-0.09, 0.09))
+        for _ in range(8)
+    ]
+    pois = []
+    for i in range(n):
+        lat, lng = rnd.choice(hubs)
+        pois.append(
+            {
+                "name": f"POI {i}",
+                "lat": lat + rnd.gauss(0, 0.008),
+                "lng": lng + rnd.gauss(0, 0.012),
+            }
+        )
+    return pois
+
+
+def _total_km(buckets: list[list[dict]]) -> float:
+    return sum(path_length_km(day) for day in buckets)
+
+
+def main(n: int, days: int, repeats: int) -> None:
+    pois = _synthetic_pois(n, seed=7)
+    plan_days(pois, days)  # Warm-up (numpy import paths, caches)
+
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        planned = plan_days(pois, days)
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    before = _total_km(_distribute_across_days(pois, days))
+    after = _total_km(planned)
+    print(f"pois={n} days={days} repeats={repeats}")
+    print(
+        f"plan_days: median {statistics.median(samples):.2f} ms, max {max(samples):.2f} ms"
+    )
+    print(
+        f"travel distance: round-robin {before:.1f} km -> geo plan {after:.1f} km ({after / before:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--pois", type=int, default=200)
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--repeats", type=int, default=50)
+    args = ap.parse_args()
+    main(args.pois, args.days, args.repeats)
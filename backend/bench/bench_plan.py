@@ -0,0 +1,217 @@
+# Purpose: End-to-end /api/agent/plan benchmark against local stand-ins for every upstream
+# Drives the real app (lifespan + middleware) in-process at fixed concurrency levels and
+# reports throughput, p50/p95/p99 per stage (from X-Debug-Timing; spans that repeat within
+# a plan, like maps_textsearch, are summed per plan) and upstream calls per plan.
+# With --baseline it is a regression gate: exit 1 if p95 or throughput regress.
+# Usage: python -m bench.bench_plan [--concurrency 1 8 32] [--requests 64]
+#        [--maps-ms 80] [--llm-ms 1200] [--error-rate 0.02] [--alias-rate 0.3]
+#        [--json out.json]
+#        [--baseline out.json --tolerance 0.15]
+import argparse  # CLI flags
+import asyncio  # Event loop + concurrency
+import json  # Results file
+import os  # Point the app at the fakes before importing it
+import sys  # Exit status for the regression gate
+import time  # Wall-clock timing
+from typing import Any, Dict, List  # Typing helpers
+
+from .fake_maps import free_port, serve, stop
+from .fake_upstreams import ENDPOINTS, Profile, make_app
+
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _pct(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile (0 for no samples)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _parse_timing(header: str) -> Dict[str, float]:
+    """'total=912.4, verify_pois=480.1, maps_textsearch=640.2/8' -> {name: ms}."""
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, value = part.strip().partition("=")
+        if value:
+            out[name] = float(value.split("/")[0])
+    return out
+
+
+def _configure_env(base: str) -> None:
+    """Every upstream -> the fake server; caches that outlive a request are off."""
+    os.environ.update(
+        {
+            "GOOGLE_MAPS_API_KEY": "bench",
+            "GOOGLE_MAPS_BASE_URL": base,
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{base}/v1",
+            "LLM_ORDER": "openai",  # Only the fake provider
+            "HOTEL_API_KEY": "bench",
+            "HOTEL_API_HOST": "bench",
+            "HOTEL_API_ENDPOINT": f"{base}/hotels",
+            "PLACE_STORE_PATH": "",  # No warm SQLite store between runs
+            "POI_INDEX_PATH": "",  # Every city is cold: measure the live pipeline
+            "PLAN_CACHE_TTL": "0",  # Measure the pipeline, not the plan cache
+            "DEBUG_TIMING_HEADER": "true",  # Per-stage breakdown per response
+            "SLOW_REQUEST_MS": "1e12",  # Keep the slow-request log quiet
+        }
+    )
+
+
+async def _run_level(
+    client: Any, fake: Any, level: int, requests: int, days: int, distinct: int
+) -> Dict[str, Any]:
+    """Fire `requests` plans with `level` in flight; return the level's summary."""
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    failures = 0
+    calls_before = dict(fake.state.calls)
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        nonlocal failures
+        while not queue.empty():
+            i = queue.get_nowait()
+            # Cities are unique per level (caches are process-wide); `distinct`
+            # > 0 repeats cities to model popular destinations
+            city = f"Bench City {level}-{i % distinct if distinct else i}"
+            body = {"city": city, "days": days, "budget": 150.0 * days}
+            t0 = time.perf_counter()
+            r = await client.post("/api/agent/plan", json=body)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if r.status_code != 200:
+                failures += 1
+                continue
+            for name, ms in _parse_timing(r.headers.get("x-debug-timing", "")).items():
+                stages.setdefault(name, []).append(ms)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(level)))
+    wall = time.perf_counter() - t0
+
+    calls = {
+        name: (fake.state.calls[name] - calls_before[name]) / requests
+        for name in ENDPOINTS
+    }
+    return {
+        "concurrency": level,
+        "requests": requests,
+        "failures": failures,
+        "throughput_rps": requests / wall,
+        "latency_ms": {f"p{int(q * 100)}": _pct(latencies, q) for q in _QUANTILES},
+        "stages_ms": {
+            name: {f"p{int(q * 100)}": _pct(v, q) for q in _QUANTILES}
+            for name, v in sorted(stages.items())
+        },
+        "upstream_calls_per_plan": calls,
+    }
+
+
+def _print_level(res: Dict[str, Any]) -> None:
+    lat = res["latency_ms"]
+    print(
+        f"\n== concurrency {res['concurrency']}: {res['throughput_rps']:.2f} plans/s, "
+        f"{res['failures']}/{res['requests']} failed, latency ms "
+        f"p50={lat['p50']:.0f} p95={lat['p95']:.0f} p99={lat['p99']:.0f}"
+    )
+    print(f"  {'stage':<22} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for name, q in res["stages_ms"].items():
+        print(f"  {name:<22} {q['p50']:>9.1f} {q['p95']:>9.1f} {q['p99']:>9.1f}")
+    calls = ", ".join(
+        f"{k}={v:.2f}" for k, v in res["upstream_calls_per_plan"].items() if v
+    )
+    print(f"  upstream calls/plan: {calls}")
+
+
+def _regressions(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """Compare p95 latency and throughput per concurrency level against a baseline."""
+    base_by_level = {b["concurrency"]: b for b in baseline}
+    problems = []
+    for res in results:
+        base = base_by_level.get(res["concurrency"])
+        if base is None:
+            continue
+        p95, base_p95 = res["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        if p95 > base_p95 * (1 + tolerance):
+            problems.append(
+                f"c={res['concurrency']}: p95 {p95:.0f}ms > baseline {base_p95:.0f}ms"
+            )
+        rps, base_rps = res["throughput_rps"], base["throughput_rps"]
+        if rps < base_rps * (1 - tolerance):
+            problems.append(
+                f"c={res['concurrency']}: {rps:.2f} plans/s < baseline {base_rps:.2f}"
+            )
+    return problems
+
+
+async def main(args: argparse.Namespace) -> int:
+    profiles = {
+        name: Profile(median_ms=args.maps_ms, error_rate=args.error_rate)
+        for name in ("textsearch", "details", "directions", "distancematrix")
+    }
+    profiles["hotels"] = Profile(median_ms=args.hotel_ms, error_rate=args.error_rate)
+    profiles["llm"] = Profile(
+        median_ms=args.llm_ms, spread=0.5, error_rate=args.error_rate
+    )
+    fake = make_app(profiles, alias_rate=args.alias_rate)
+    port = free_port()
+    server = await serve(fake, port)
+    _configure_env(f"http://127.0.0.1:{port}")
+
+    import httpx  # noqa: E402  # Imported after env is set (settings load on import)
+    from app.main import app, lifespan  # noqa: E402
+
+    print(
+        f"fakes: maps~{args.maps_ms:.0f}ms llm~{args.llm_ms:.0f}ms "
+        f"hotels~{args.hotel_ms:.0f}ms error_rate={args.error_rate:.2%}, "
+        f"days={args.days}, requests/level={args.requests}"
+    )
+    results = []
+    async with lifespan(app):  # Same startup/shutdown as under uvicorn
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            for level in args.concurrency:
+                res = await _run_level(
+                    client, fake, level, args.requests, args.days, args.distinct
+                )
+                _print_level(res)
+                results.append(res)
+    await stop(server)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = _regressions(results, json.load(f), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--requests", type=int, default=64, help="plans per level")
+    ap.add_argument("--days", type=int, default=3)
+    ap.add_argument("--distinct", type=int, default=0, help="cities per level (0=all)")
+    ap.add_argument("--maps-ms", type=float, default=80.0)
+    ap.add_argument("--hotel-ms", type=float, default=300.0)
+    ap.add_argument("--llm-ms", type=float, default=1200.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument(
+        "--alias-rate", type=float, default=0.0, help="share of repeated LLM POIs"
+    )
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--baseline", help="results file to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.15)
+    sys.exit(asyncio.run(main(ap.parse_args())))
@@ -0,0 +1,34 @@
+# Purpose: Per-request settings overhead — a fresh Settings() per stage vs the shared singleton
+# Usage: python -m bench.bench_settings [--requests 2000]
+import argparse  # CLI flags
+import time  # perf_counter
+
+from app.settings import Settings, get_settings
+
+# Settings() constructions per /api/agent/plan before the singleton: orchestrator,
+# llm_poi_candidates, verify_pois, estimate_budget, _provider_price_nightly
+_STAGES_PER_REQUEST = 5
+
+
+def _per_request_us(fn, requests: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        for _ in range(_STAGES_PER_REQUEST):
+            fn()
+    return (time.perf_counter() - t0) / requests * 1e6
+
+
+def main(requests: int) -> None:
+    get_settings()  # Loaded once at startup in the app
+    before = _per_request_us(Settings, requests)
+    after = _per_request_us(get_settings, requests)
+    print(f"requests={requests}, settings lookups per request={_STAGES_PER_REQUEST}")
+    print(f"before (Settings() per stage): {before:9.1f} us/request")
+    print(f"after  (get_settings()):       {after:9.3f} us/request")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--requests", type=int, default=2000)
+    args = ap.parse_args()
+    main(args.requests)
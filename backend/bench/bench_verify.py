@@ -0,0 +1,63 @@
+# Purpose: Wall-clock comparison of sequential vs concurrent verify_pois against a fake Maps server
+# Usage: python -m bench.bench_verify [--latency-ms 80]
+import argparse  # CLI flags
+import asyncio  # Event loop
+import os  # Point the adapters at the fake server before importing them
+import time  # Wall-clock timing
+
+from .fake_maps import free_port, make_app, serve, stop
+
+
+async def _sequential(names, city, search, detail):
+    """Reference implementation: the old one-candidate-at-a-time loop."""
+    out = []
+    for name in names:
+        results = await search(f"{name} {city}")
+        if results:
+            d = await detail(results[0]["place_id"])
+            if d:
+                out.append(d)
+    return out
+
+
+async def main(latency_ms: float, sizes: list[int]) -> None:
+    port = free_port()
+    os.environ["GOOGLE_MAPS_API_KEY"] = "bench"
+    os.environ["GOOGLE_MAPS_BASE_URL"] = f"http://127.0.0.1:{port}"
+    server = await serve(
+        make_app(latency_ms=latency_ms, jitter_ms=latency_ms / 4), port
+    )
+
+    from app.agents.verifier import verify_pois  # Imported after env is set
+    from app.tools.maps import google_place_search, google_place_detail
+    from app.tools.http import close_http_client
+
+    print(f"fake maps latency={latency_ms:.0f}ms")
+    print(
+        f"{'candidates':>10} {'sequential_s':>13} {'concurrent_s':>13} {'speedup':>8}"
+    )
+    for n in sizes:
+        # Distinct names per run so neither side is served from the place cache
+        seq_names = [f"Sequential {n}-{i}" for i in range(n)]
+        conc_names = [f"Concurrent {n}-{i}" for i in range(n)]
+        t0 = time.perf_counter()
+        seq = await _sequential(
+            seq_names, "Paris", google_place_search, google_place_detail
+        )
+        t_seq = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        conc = await verify_pois(conc_names, "Paris")
+        t_conc = time.perf_counter() - t0
+        assert len(seq) == len(conc) == n
+        print(f"{n:>10} {t_seq:>13.3f} {t_conc:>13.3f} {t_seq / t_conc:>7.1f}x")
+
+    await close_http_client()
+    await stop(server)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[8, 24, 64])
+    args = ap.parse_args()
+    asyncio.run(main(args.latency_ms, args.sizes))
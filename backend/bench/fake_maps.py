@@ -0,0 +1,98 @@
+# Purpose: Local stand-in for the Google Places/Details/Directions APIs used by benchmarks
+import asyncio  # Simulated latency + background server task
+import random  # Latency jitter
+import socket  # Pick a free local port
+from typing import Dict, Any  # Typing helpers
+
+import uvicorn  # ASGI server for the fake API
+from fastapi import FastAPI  # Fake endpoints
+
+
+def make_app(latency_ms: float = 80.0, jitter_ms: float = 20.0) -> FastAPI:
+    """Build a FastAPI app mimicking the Maps endpoints with a fixed latency (+ jitter)."""
+    app = FastAPI()
+    app.state.calls = {}  # endpoint -> call count
+
+    async def _delay(endpoint: str) -> None:
+        app.state.calls[endpoint] = app.state.calls.get(endpoint, 0) + 1
+        await asyncio.sleep(
+            max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+        )
+
+    def _coords(seed: str) -> Dict[str, float]:
+        rnd = random.Random(seed)  # Stable coordinates per place
+        return {
+            "lat": 48.85 + rnd.uniform(-0.05, 0.05),
+            "lng": 2.35 + rnd.uniform(-0.05, 0.05),
+        }
+
+    @app.get("/maps/api/place/textsearch/json")
+    async def textsearch(query: str) -> Dict[str, Any]:
+        await _delay("textsearch")
+        pid = f"pid-{abs(hash(query)) % 10**8}"
+        return {
+            "results": [
+                {
+                    "name": query,
+                    "formatted_address": f"{query} address",
+                    "place_id": pid,
+                    "rating": 4.5,
+                    "geometry": {"location": _coords(pid)},
+                }
+            ]
+        }
+
+    @app.get("/maps/api/place/details/json")
+    async def details(place_id: str) -> Dict[str, Any]:
+        await _delay("details")
+        return {
+            "result": {
+                "name": f"Place {place_id}",
+                "formatted_address": f"{place_id} address",
+                "rating": 4.5,
+                "geometry": {"location": _coords(place_id)},
+                "url": f"https://maps.example/{place_id}",
+                "opening_hours": {"weekday_text": ["Monday: 9:00 AM – 6:00 PM"]},
+            }
+        }
+
+    @app.get("/maps/api/directions/json")
+    async def directions(origin: str, destination: str) -> Dict[str, Any]:
+        await _delay("directions")
+        leg = {"duration": {"value": 900}, "distance": {"value": 3200}}
+        return {"routes": [{"legs": [leg]}]}
+
+    @app.get("/maps/api/distancematrix/json")
+    async def distancematrix(origins: str, destinations: str) -> Dict[str, Any]:
+        await _delay("distancematrix")
+        cell = {"status": "OK", "duration": {"value": 900}, "distance": {"value": 3200}}
+        n_dest = len(destinations.split("|"))
+        return {"rows": [{"elements": [cell] * n_dest} for _ in origins.split("|")]}
+
+    return app
+
+
+def free_port() -> int:
+    """Ask the OS for an unused localhost port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def serve(app: FastAPI, port: int) -> uvicorn.Server:
+    """Start `app` on localhost:`port` in the running loop and wait until it accepts requests."""
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server.task = asyncio.create_task(
+        server.serve()
+    )  # Kept so callers can await shutdown
+    while not server.started:  # uvicorn flips this once the socket is bound
+        await asyncio.sleep(0.01)
+    return server
+
+
+async def stop(server: uvicorn.Server) -> None:
+    """Ask the fake server to exit and wait for it."""
+    server.should_exit = True
+    await server.task
@@ -0,0 +1,223 @@
+# Purpose: One local stand-in for every upstream the planner calls (Maps, hotels, LLM)
+# - Google Places text search / Details / Directions / Distance Matrix
+# - Hotel pricing (HOTEL_API_ENDPOINT = <base>/hotels)
+# - OpenAI-compatible chat completions (OPENAI_BASE_URL = <base>/v1)
+# Each endpoint has its own latency distribution, error rate and optional QPS quota
+# (Profile), and counts calls. `alias_rate` makes the LLM repeat some POIs under other
+# names ("The X", "X Museum", "Musée du X"), as real model output does.
+import asyncio  # Simulated latency
+import json  # LLM request/response payloads
+import random  # Latency draws + error injection
+import time  # Quota windows
+from collections import deque  # Recent request timestamps per endpoint
+from dataclasses import dataclass  # Latency profiles
+from typing import Any, AsyncIterator, Dict, Optional  # Typing helpers
+
+from fastapi import FastAPI, Request  # Fake endpoints
+from fastapi.responses import JSONResponse, StreamingResponse  # Errors, SSE
+
+ENDPOINTS = ("textsearch", "details", "directions", "distancematrix", "hotels", "llm")
+
+
+@dataclass
+class Profile:
+    """Latency distribution + failure rate for one fake endpoint."""
+
+    median_ms: float = 80.0
+    # "fixed" | "uniform" (median +- spread) | "lognormal" (sigma = spread, long tail)
+    dist: str = "lognormal"
+    spread: float = 0.35
+    error_rate: float = 0.0  # Share of calls answered with HTTP 500
+    # Requests/second before answering OVER_QUERY_LIMIT (Maps) / HTTP 429 (0 = no quota)
+    quota_qps: float = 0.0
+
+    def draw_ms(self, rnd: random.Random) -> float:
+        if self.dist == "fixed":
+            return self.median_ms
+        if self.dist == "uniform":
+            return max(
+                0.0, self.median_ms * (1 + rnd.uniform(-self.spread, self.spread))
+            )
+        return self.median_ms * rnd.lognormvariate(0.0, self.spread)
+
+
+# How the fake LLM re-phrases a POI it already listed
+_ALIASES = ("The {name}", "{name} Museum", "Musée du {name}", "{name}, {city}")
+
+_FIRST_TOKEN_SHARE = (
+    0.15  # Streamed answers: share of the latency before the first chunk
+)
+_CHUNK_CHARS = 24  # Characters per streamed delta (a few tokens)
+
+
+async def _sse_chunks(content: str, total_ms: float) -> AsyncIterator[str]:
+    """OpenAI-style chat.completion.chunk events, spread evenly over `total_ms`."""
+    pieces = [
+        content[i : i + _CHUNK_CHARS] for i in range(0, len(content), _CHUNK_CHARS)
+    ]
+    for piece in pieces:
+        await asyncio.sleep(total_ms / len(pieces) / 1000)
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {"content": piece}}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def _coords(seed: str) -> Dict[str, float]:
+    rnd = random.Random(seed)  # Stable coordinates per place
+    return {
+        "lat": 48.85 + rnd.uniform(-0.05, 0.05),
+        "lng": 2.35 + rnd.uniform(-0.05, 0.05),
+    }
+
+
+def make_app(
+    profiles: Optional[Dict[str, Profile]] = None,
+    seed: int = 7,
+    alias_rate: float = 0.0,
+) -> FastAPI:
+    """Fake upstream API; `profiles` maps endpoint name (see ENDPOINTS) -> Profile."""
+    app = FastAPI()
+    app.state.calls = {name: 0 for name in ENDPOINTS}  # endpoint -> call count
+    app.state.errors = {name: 0 for name in ENDPOINTS}  # endpoint -> injected errors
+    app.state.throttled = {name: 0 for name in ENDPOINTS}  # endpoint -> over quota
+    profiles = profiles or {}
+    rnd = random.Random(seed)
+    recent = {
+        name: deque() for name in ENDPOINTS
+    }  # Accepted request times (1 s window)
+
+    def _over_quota(endpoint: str, prof: Profile) -> bool:
+        if prof.quota_qps <= 0:
+            return False
+        now, window = time.monotonic(), recent[endpoint]
+        while window and now - window[0] > 1.0:
+            window.popleft()
+        if len(window) >= prof.quota_qps:
+            app.state.throttled[endpoint] += 1
+            return True
+        window.append(now)
+        return False
+
+    async def _serve(endpoint: str, share: float = 1.0) -> Optional[JSONResponse]:
+        """
+        Count, sleep `share` of a latency draw; returns an error response when one is
+        injected. Streams sleep a part up front and spread the rest over their chunks.
+        """
+        prof = profiles.get(endpoint) or Profile()
+        app.state.calls[endpoint] += 1
+        if _over_quota(endpoint, prof):
+            if endpoint in ("hotels", "llm"):
+                return JSONResponse({"error": "rate limited"}, status_code=429)
+            return JSONResponse({"status": "OVER_QUERY_LIMIT", "results": []})
+        await asyncio.sleep(prof.draw_ms(rnd) * share / 1000)
+        if rnd.random() < prof.error_rate:
+            app.state.errors[endpoint] += 1
+            return JSONResponse({"error": "injected"}, status_code=500)
+        return None
+
+    @app.get("/maps/api/place/textsearch/json")
+    async def textsearch(query: str) -> Any:
+        if err := await _serve("textsearch"):
+            return err
+        pid = f"pid-{abs(hash(query)) % 10**8}"
+        return {
+            "status": "OK",
+            "results": [
+                {
+                    "name": query,
+                    "formatted_address": f"{query} address",
+                    "place_id": pid,
+                    "rating": 4.5,
+                    "geometry": {"location": _coords(pid)},
+                }
+            ],
+        }
+
+    @app.get("/maps/api/place/details/json")
+    async def details(place_id: str) -> Any:
+        if err := await _serve("details"):
+            return err
+        return {
+            "status": "OK",
+            "result": {
+                "name": f"Place {place_id}",
+                "formatted_address": f"{place_id} address",
+                "rating": 4.5,
+                "geometry": {"location": _coords(place_id)},
+                "url": f"https://maps.example/{place_id}",
+                "opening_hours": {"weekday_text": ["Monday: 9:00 AM – 6:00 PM"]},
+            },
+        }
+
+    @app.get("/maps/api/directions/json")
+    async def directions(origin: str, destination: str) -> Any:
+        if err := await _serve("directions"):
+            return err
+        leg = {"duration": {"value": 900}, "distance": {"value": 3200}}
+        return {"status": "OK", "routes": [{"legs": [leg]}]}
+
+    @app.get("/maps/api/distancematrix/json")
+    async def distancematrix(origins: str, destinations: str) -> Any:
+        if err := await _serve("distancematrix"):
+            return err
+        cell = {"status": "OK", "duration": {"value": 900}, "distance": {"value": 3200}}
+        n_dest = len(destinations.split("|"))
+        return {
+            "status": "OK",
+            "rows": [{"elements": [cell] * n_dest} for _ in origins.split("|")],
+        }
+
+    @app.get("/hotels")
+    async def hotels(city: str, nights: str = "1") -> Any:
+        if err := await _serve("hotels"):
+            return err
+        base = 60 + abs(hash(city)) % 120
+        return {"results": [{"price": base + 10 * i} for i in range(5)]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        stream = bool(body.get("stream"))
+        # Streams: time to first token is ~15% of the answer, the rest is generation
+        if err := await _serve("llm", _FIRST_TOKEN_SHARE if stream else 1.0):
+            return err
+        # The planner sends its request as a JSON user message (see build_poi_prompt)
+        user = json.loads(body["messages"][-1]["content"])
+        count = max(8, int(user.get("days", 3)) * 3 + 2)
+        prefs = "-".join(user.get("preferences") or []) or "sights"
+        names = [f"{user['city']} {prefs} spot {i}" for i in range(count)]
+        for i in range(1, count):  # Aliases replace later entries, like real answers
+            if rnd.random() < alias_rate:
+                pattern = rnd.choice(_ALIASES)
+                names[i] = pattern.format(name=rnd.choice(names[:i]), city=user["city"])
+        pois = [{"name": name, "category": prefs} for name in names]
+        content = json.dumps({"pois": pois})
+        if stream:
+            prof = profiles.get("llm") or Profile()
+            rest_ms = prof.draw_ms(rnd) * (1 - _FIRST_TOKEN_SHARE)
+            return StreamingResponse(
+                _sse_chunks(content, rest_ms), media_type="text/event-stream"
+            )
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "bench"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": content,
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
@@ -0,0 +1,94 @@
+# Purpose: Incremental parsing of streamed LLM output (app/llm/stream_json.py)
+import json
+
+import pytest
+
+from app.llm.stream_json import PoiStreamParser
+
+# Strings full of characters that would confuse a bracket counter, plus escapes
+TRICKY = [
+    {"name": 'Café "Le {Bon}"', "note": "open [daily]"},
+    {"name": 'Back\\slash \\" mix', "address": "1 Rue été"},
+    {"name": "Nested", "loc": {"lat": 48.85, "lng": 2.35}, "tags": ["x", {"y": 1}]},
+]
+DOC = json.dumps({"pois": TRICKY}, ensure_ascii=True)
+
+
+def parse(chunks):
+    """Feed chunks one by one; return every object the parser emitted."""
+    parser = PoiStreamParser()
+    out = []
+    for chunk in chunks:
+        out.extend(parser.feed(chunk))
+    return parser, out
+
+
+def test_whole_document():
+    _, out = parse([DOC])
+    assert out == TRICKY
+
+
+@pytest.mark.parametrize("cut", range(1, len(DOC)))
+def test_any_chunk_boundary(cut):
+    # Every split point, including inside strings and between "\" and what it escapes
+    _, out = parse([DOC[:cut], DOC[cut:]])
+    assert out == TRICKY
+
+
+def test_one_character_at_a_time():
+    parser, out = parse(list(DOC))
+    assert out == TRICKY
+    assert parser.count == len(TRICKY)
+    assert parser.text == DOC
+
+
+def test_objects_emitted_as_soon_as_they_close():
+    first = json.dumps(TRICKY[0])
+    parser = PoiStreamParser()
+    assert parser.feed('{"pois": [' + first[:-1]) == []
+    assert parser.feed(first[-1] + ", ") == [TRICKY[0]]
+
+
+def test_escaped_quote_at_chunk_end():
+    # The chunk ends right after the backslash: the next quote must not close the string
+    _, out = parse(['{"pois": [{"name": "say \\', '"hi\\"', ' }"}]}'])
+    assert out == [{"name": 'say "hi" }'}]
+
+
+def test_code_fence_and_prose_are_skipped():
+    _, out = parse(["Sure! Here you go:\n```json\n", DOC, "\n```\nEnjoy."])
+    assert out == TRICKY
+
+
+def test_bare_top_level_array():
+    _, out = parse(['[{"name": "A"}, ', '{"name": "B"}]'])
+    assert out == [{"name": "A"}, {"name": "B"}]
+
+
+def test_other_top_level_arrays_are_ignored():
+    doc = json.dumps({"tips": [{"name": "Tip"}], "pois": [{"name": "A"}]})
+    _, out = parse([doc])
+    assert out == [{"name": "A"}]
+
+
+def test_pois_as_a_value_is_not_a_key():
+    doc = '{"x": "pois", "tips": [{"name": "Tip"}]}'
+    _, out = parse([doc])
+    assert out == []
+
+
+def test_malformed_object_is_skipped():
+    parser, out = parse(['{"pois": [{"name": "A",}, {"name": "B"}]}'])
+    assert out == [{"name": "B"}]
+    assert parser.count == 1
+
+
+def test_non_object_items_are_ignored():
+    _, out = parse(['[1, "two", ["x"], {"name": "A"}]'])
+    assert out == [{"name": "A"}]
+
+
+def test_truncated_stream_keeps_finished_objects():
+    doc = json.dumps({"pois": [{"name": "A"}, {"name": "B"}]})
+    parser, out = parse([doc[: doc.index('"B"')]])
+    assert out == [{"name": "A"}]
@@ -0,0 +1,71 @@
+# Purpose: Name matching used to dedupe LLM candidates and verified POIs (app/utils/text.py)
+import pytest
+
+from app.utils.text import FuzzyDeduper, city_tokens, name_similarity
+
+# Different places that share every word apart from what kind of place they are
+DISTINCT = [
+    ("Palazzo Vecchio", "Ponte Vecchio", "Florence"),
+    ("Piazza San Marco", "Basilica di San Marco", "Venice"),
+    ("Jardin du Luxembourg", "Palais du Luxembourg", "Paris"),
+    ("St. Peter's Basilica", "St. Peter's Square", "Rome"),
+    ("Opéra Bastille", "Place de la Bastille", "Paris"),
+    ("Central Park", "Central Park Zoo", "New York"),
+    ("Pier 39", "Pier 17", "San Francisco"),
+    ("Saint-Sulpice", "Saint-Eustache", "Paris"),
+    ("Gion", "Ginza", "Tokyo"),
+    ("Tate Modern", "Tate Britain", "London"),
+]
+
+# One place under two names (articles, type words in another language, typos)
+SAME = [
+    ("Louvre", "The Louvre", "Paris"),
+    ("Musée du Louvre", "Louvre Museum", "Paris"),
+    ("Prado Museum", "Museo del Prado", "Madrid"),
+    ("Tuileries Garden", "Jardin des Tuileries", "Paris"),
+    ("Trevi Fountain", "Fontana di Trevi", "Rome"),
+    ("Sacré-Cœur", "Sacre Coeur", "Paris"),
+    ("Colosseum", "Coliseum", "Rome"),
+    ("Montmartre", "Montmarte", "Paris"),
+    ("Hagia Sophia", "Haghia Sophia", "Istanbul"),
+    ("Louvre Paris", "Louvre", "Paris"),
+]
+
+
+def _dedupe(a: str, b: str, city: str) -> bool:
+    """True when the deduper drops `b` after accepting `a`."""
+    seen = FuzzyDeduper(ignore=city_tokens(city))
+    assert seen.add(a)
+    return not seen.add(b)
+
+
+@pytest.mark.parametrize("a, b, city", DISTINCT)
+def test_distinct_places_are_kept(a: str, b: str, city: str) -> None:
+    assert not _dedupe(a, b, city)
+    assert not _dedupe(b, a, city)
+
+
+@pytest.mark.parametrize("a, b, city", SAME)
+def test_aliases_are_merged(a: str, b: str, city: str) -> None:
+    assert _dedupe(a, b, city)
+    assert _dedupe(b, a, city)
+
+
+def test_unstated_kind_matches_either_kind() -> None:
+    seen = FuzzyDeduper(ignore=city_tokens("Florence"))
+    assert seen.add("Palazzo Vecchio")
+    assert seen.add("Ponte Vecchio")
+    assert not seen.add("Vecchio")
+
+
+def test_threshold_above_one_is_exact_only() -> None:
+    seen = FuzzyDeduper(threshold=1.1)
+    assert seen.add("Louvre")
+    assert seen.add("The Louvre")
+    assert not seen.add("louvre")
+
+
+def test_name_similarity_blocks_different_kinds() -> None:
+    assert name_similarity("Piazza San Marco", "Basilica di San Marco") == 0.0
+    assert name_similarity("Musée du Louvre", "The Louvre") == 1.0
+    assert name_similarity("Marché d'Aligre", "Aligre Market") == 1.0
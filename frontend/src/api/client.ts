@@ -1,7 +1,7 @@
 // Minimal API client to call the backend planner endpoint.
 // Keeps networking isolated from UI components.
 
-import type { PlanRequest } from "../types/app";
+import type { PlanEvent, PlanRequest } from "../types/app";
 
 const BASE = import.meta.env.VITE_BACKEND_URL || "http://localhost:8000"; // Configurable via env
 
@@ -20,4 +20,34 @@ export async function planTrip(req: PlanRequest) {
     }
 
     return res.json();
-}
\ No newline at end of file
+}
+
+export async function* planTripStream(req: PlanRequest, signal?: AbortSignal): AsyncGenerator<PlanEvent> {
+    // NDJSON stream: yields progress events as each pipeline stage finishes.
+    // Aborting `signal` closes the connection, which cancels the remaining backend work.
+    const res = await fetch(`${BASE}/api/agent/plan/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(req),
+        signal
+    });
+
+    if (!res.ok || !res.body) {
+        const text = await res.text();
+        throw new Error(`HTTP ${res.status}: ${text}`);
+    }
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffered = "";
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += value;
+        const lines = buffered.split("\n");
+        buffered = lines.pop() ?? ""; // Keep the partial last line
+        for (const line of lines) {
+            if (line.trim()) yield JSON.parse(line) as PlanEvent;
+        }
+    }
+    if (buffered.trim()) yield JSON.parse(buffered) as PlanEvent;
+}
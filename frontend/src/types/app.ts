@@ -21,9 +21,10 @@ export type Source = {
 export type Cost = { amount: number; currency: string };
 
 export type Transport = {
-  mode: "walk" | "metro" | "bus" | "car" | "train" | "flight";
+  mode: "walk" | "metro" | "bus" | "car" | "train" | "flight" | "transit";
   duration_min: number;
   distance_km?: number;
+  estimated?: boolean;          // True when routing failed and the leg is a straight-line guess
 };
 
 export type POI = {
@@ -82,3 +83,13 @@ export type Itinerary = {
   /** Optional explain block attached by backend (Sprint 1: often only `lodging`) */
   budget_explain?: BudgetExplain;
 };
+
+// ---- Streaming plan events (POST /api/agent/plan/stream, one JSON object per line) ----
+export type PlanEvent =
+  | { event: "accepted"; data: { city: string; days: number } }
+  | { event: "candidates"; data: { candidates: string[] } }
+  | { event: "poi"; data: POI & { url?: string } }                     // Each verified POI
+  | { event: "day"; data: { index: number; date: string; items: DayItem[] } } // Each routed day
+  | { event: "budget"; data: { totals: Totals; budget_explain?: BudgetExplain } }
+  | { event: "itinerary"; data: Itinerary }                            // Final, validated
+  | { event: "error"; data: { detail: string } };